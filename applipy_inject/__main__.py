@@ -0,0 +1,45 @@
+from argparse import ArgumentParser
+from typing import List, Optional
+import asyncio
+import json
+import sys
+
+from applipy_inject.analysis import analyze, load_injector, time_providers
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = ArgumentParser(prog='python -m applipy_inject')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    inspect = commands.add_parser('inspect', help='report on the dependency graph of an injector')
+    inspect.add_argument('injector', metavar='module:function',
+                         help='function that takes no arguments and returns a configured injector')
+    inspect.add_argument('--json', action='store_true', help='output the report as JSON')
+    inspect.add_argument('--time', action='store_true', help='time the construction of each provider')
+    inspect.add_argument('--top', type=int, default=10, help='number of entries of the ranked sections')
+    inspect.add_argument('--min-paths', type=int, default=2,
+                         help='minimum number of paths to report a transient binding')
+
+    args = parser.parse_args(argv)
+
+    injector = load_injector(args.injector)
+    report = analyze(injector, top=args.top, min_paths=args.min_paths)
+    if args.time:
+        # Timing instantiates the dependencies of the providers, which are
+        # cleaned up before exiting. aclose() cleans up synchronous and
+        # asynchronous providers alike.
+        try:
+            report.timings = time_providers(injector)[:args.top]
+        finally:
+            asyncio.run(injector.aclose())
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.format())
+
+    return 1 if report.has_errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,319 @@
+from collections import deque
+from importlib import import_module
+from time import perf_counter
+from typing import (
+    Any,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+import inspect
+
+from applipy_inject.inject import (
+    DependencyType,
+    Injector,
+    Item,
+    ProviderType,
+    _get_class_name,
+    _Resolution,
+)
+
+
+Key = Tuple[Optional[str], type]
+
+
+def format_key(key: Key) -> str:
+    name, type_ = key
+    if name is None:
+        return _get_class_name(type_)
+    return f'{_get_class_name(type_)} (name={name})'
+
+
+class Binding:
+
+    key: Key
+    dependency: Key
+    providers: List[str]
+
+    def __init__(self, key: Key, dependency: Key, providers: List[str]) -> None:
+        self.key = key
+        self.dependency = dependency
+        self.providers = providers
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'key': format_key(self.key),
+            'dependency': format_key(self.dependency),
+            'providers': self.providers,
+        }
+
+
+class FanIn:
+
+    key: Key
+    dependents: int
+    is_singleton: bool
+
+    def __init__(self, key: Key, dependents: int, is_singleton: bool) -> None:
+        self.key = key
+        self.dependents = dependents
+        self.is_singleton = is_singleton
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'key': format_key(self.key),
+            'dependents': self.dependents,
+            'lifetime': 'singleton' if self.is_singleton else 'transient',
+        }
+
+
+class TransientPaths:
+
+    key: Key
+    paths: int
+
+    def __init__(self, key: Key, paths: int) -> None:
+        self.key = key
+        self.paths = paths
+
+    def to_dict(self) -> dict[str, Any]:
+        return {'key': format_key(self.key), 'paths': self.paths}
+
+
+class Timing:
+
+    key: Key
+    provider: str
+    seconds: Optional[float]
+    error: Optional[str]
+
+    def __init__(self, key: Key, provider: str, seconds: Optional[float], error: Optional[str]) -> None:
+        self.key = key
+        self.provider = provider
+        self.seconds = seconds
+        self.error = error
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'key': format_key(self.key),
+            'provider': self.provider,
+            'seconds': self.seconds,
+            'error': self.error,
+        }
+
+
+class GraphReport:
+
+    missing: List[Binding]
+    ambiguous: List[Binding]
+    cycles: List[List[Key]]
+    fan_in: List[FanIn]
+    longest_chains: List[List[Key]]
+    transient_paths: List[TransientPaths]
+    timings: List[Timing]
+
+    def __init__(self) -> None:
+        self.missing = []
+        self.ambiguous = []
+        self.cycles = []
+        self.fan_in = []
+        self.longest_chains = []
+        self.transient_paths = []
+        self.timings = []
+
+    @property
+    def has_errors(self) -> bool:
+        return bool(self.missing or self.cycles)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'missing': [b.to_dict() for b in self.missing],
+            'ambiguous': [b.to_dict() for b in self.ambiguous],
+            'cycles': [[format_key(k) for k in cycle] for cycle in self.cycles],
+            'fan_in': [f.to_dict() for f in self.fan_in],
+            'longest_chains': [[format_key(k) for k in chain] for chain in self.longest_chains],
+            'transient_paths': [t.to_dict() for t in self.transient_paths],
+            'timings': [t.to_dict() for t in self.timings],
+        }
+
+    def format(self) -> str:
+        lines: List[str] = []
+
+        def section(title: str, entries: List[str]) -> None:
+            lines.append(f'{title} ({len(entries)})')
+            lines.extend(f'  {entry}' for entry in entries)
+            lines.append('')
+
+        section('Missing bindings', [f'{format_key(b.dependency)} required by {format_key(b.key)}'
+                                     for b in self.missing])
+        section('Ambiguous bindings', [f'{format_key(b.dependency)} required by {format_key(b.key)}: '
+                                       + ', '.join(b.providers) for b in self.ambiguous])
+        section('Dependency cycles', [' -> '.join(format_key(k) for k in cycle) for cycle in self.cycles])
+        section('Fan-in', [f'{f.dependents:>4} {"singleton" if f.is_singleton else "transient"} {format_key(f.key)}'
+                           for f in self.fan_in])
+        section('Longest dependency chains', [f'{len(chain):>4} ' + ' -> '.join(format_key(k) for k in chain)
+                                              for chain in self.longest_chains])
+        section('Transient bindings resolved through many paths', [f'{t.paths:>4} {format_key(t.key)}'
+                                                                   for t in self.transient_paths])
+        if self.timings:
+            section('Provider timings', [
+                f'{t.seconds * 1000:>10.3f} ms {format_key(t.key)}' if t.seconds is not None
+                else f'{"error":>13} {format_key(t.key)}: {t.error}'
+                for t in self.timings
+            ])
+
+        return '\n'.join(lines)
+
+
+def _provider_name(item: Item[Any]) -> str:
+    return getattr(item.provider.callable_, '__qualname__', None) or repr(item.provider.callable_)
+
+
+def analyze(injector: Injector, top: int = 10, min_paths: int = 2) -> GraphReport:
+    report = GraphReport()
+
+    # Dependencies on generic types are followed to include the specializations
+    # of generic bindings in the graph.
+    providers: dict[Key, Tuple[Item[object], ...]] = dict(injector.providers)
+    pending = deque(providers)
+    graph: dict[Key, List[Key]] = {}
+    while pending:
+        key = pending.popleft()
+        edges = graph.setdefault(key, [])
+        for item in providers[key]:
+            for dependency in item.provider.dependencies:
+                dependency_key = (dependency.name, dependency.type_)
+                if dependency_key not in providers:
+                    bound = injector._get_items(dependency_key)
+                    if bound:
+                        providers[dependency_key] = bound
+                        pending.append(dependency_key)
+                bound = providers.get(dependency_key, ())
+                if not bound:
+                    if dependency.dep_type == DependencyType.Required:
+                        report.missing.append(Binding(key, dependency_key, [_provider_name(item)]))
+                    continue
+                if len(bound) > 1 and dependency.dep_type != DependencyType.Collection:
+                    report.ambiguous.append(Binding(key, dependency_key, [_provider_name(i) for i in bound]))
+                if dependency_key not in edges:
+                    edges.append(dependency_key)
+
+    # Depth first search that splits edges into the ones closing a cycle and the
+    # ones of the remaining acyclic graph, used for the rest of the analysis.
+    acyclic: dict[Key, List[Key]] = {key: [] for key in graph}
+    state: dict[Key, int] = {}
+    stack: List[Key] = []
+    for root in graph:
+        if root in state:
+            continue
+        state[root] = 1
+        stack.append(root)
+        iterators = [iter(graph[root])]
+        while iterators:
+            key = stack[-1]
+            next_key = next(iterators[-1], None)
+            if next_key is None:
+                state[key] = 2
+                stack.pop()
+                iterators.pop()
+            elif state.get(next_key) == 1:
+                report.cycles.append(stack[stack.index(next_key):] + [next_key])
+            else:
+                acyclic[key].append(next_key)
+                if next_key not in state:
+                    state[next_key] = 1
+                    stack.append(next_key)
+                    iterators.append(iter(graph[next_key]))
+
+    dependents: dict[Key, List[Key]] = {key: [] for key in graph}
+    for key, dependencies in acyclic.items():
+        for dependency_key in dependencies:
+            dependents[dependency_key].append(key)
+
+    def is_singleton(key: Key) -> bool:
+        return all(item.is_singleton for item in providers[key])
+
+    report.fan_in = sorted((FanIn(key, len(keys), is_singleton(key)) for key, keys in dependents.items() if keys),
+                           key=lambda f: -f.dependents)[:top]
+
+    chains: dict[Key, List[Key]] = {}
+    for key in _topological_order(acyclic):
+        longest = max((chains[d] for d in acyclic[key]), key=len, default=[])
+        chains[key] = [key] + longest
+    report.longest_chains = sorted((chains[key] for key in graph if not dependents[key]), key=lambda c: -len(c))[:top]
+
+    paths: dict[Key, int] = {}
+    for key in reversed(_topological_order(acyclic)):
+        paths[key] = sum(paths[d] for d in dependents[key]) or 1
+    report.transient_paths = sorted(
+        (TransientPaths(key, count) for key, count in paths.items() if count >= min_paths and not is_singleton(key)),
+        key=lambda t: -t.paths,
+    )[:top]
+
+    return report
+
+
+# Dependencies go before their dependents
+def _topological_order(graph: dict[Key, List[Key]]) -> List[Key]:
+    order: List[Key] = []
+    visited: set[Key] = set()
+    for root in graph:
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [(root, iter(graph[root]))]
+        while stack:
+            key, dependencies = stack[-1]
+            dependency_key = next(dependencies, None)
+            if dependency_key is None:
+                order.append(key)
+                stack.pop()
+            elif dependency_key not in visited:
+                visited.add(dependency_key)
+                stack.append((dependency_key, iter(graph[dependency_key])))
+    return order
+
+
+def time_providers(injector: Injector, keys: Optional[Iterable[Key]] = None) -> List[Timing]:
+    timings: List[Timing] = []
+    providers = injector.providers
+    instances = {item for items in providers.values() for item in items if item.instance is not None}
+    for key in (keys if keys is not None else providers):
+        for item in providers.get(key, ()):
+            provider = item.provider
+            if item in instances:
+                continue
+            try:
+                if provider.is_async:
+                    raise TypeError('asynchronous providers cannot be timed')
+                resolution = _Resolution((key,))
+                arguments = {dependency.varname: injector._get_dependency(dependency, resolution)
+                             for dependency in provider.dependencies}
+                start = perf_counter()
+                instance: Any = provider.callable_(**arguments)
+                if provider.provider_type == ProviderType.Generator:
+                    next(instance)
+                seconds: Optional[float] = perf_counter() - start
+                error = None
+                if inspect.isgenerator(instance):
+                    next(instance, None)
+            except Exception as e:
+                seconds = None
+                error = f'{type(e).__name__}: {e}'
+            timings.append(Timing(key, _provider_name(item), seconds, error))
+    timings.sort(key=lambda t: -(t.seconds or 0))
+    return timings
+
+
+def load_injector(path: str) -> Injector:
+    module_name, _, attribute = path.partition(':')
+    if not module_name or not attribute:
+        raise ValueError(f'Expected `module:function`, got `{path}`')
+    target: Any = import_module(module_name)
+    for part in attribute.split('.'):
+        target = getattr(target, part)
+    injector = target()
+    if not isinstance(injector, Injector):
+        raise TypeError(f'`{path}` returned `{injector!r}` instead of an `Injector`')
+    return injector
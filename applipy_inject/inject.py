@@ -1,10 +1,17 @@
 from typing import (
+    AbstractSet,
     Annotated,
     Any,
+    AsyncGenerator,
+    Awaitable,
     Callable,
+    FrozenSet,
+    Generator,
     Generic,
     Iterable,
+    Iterator,
     List,
+    Mapping,
     Optional,
     Set,
     Tuple,
@@ -17,9 +24,20 @@ from typing import (
     get_origin,
     get_type_hints
 )
-from types import UnionType, GenericAlias
-from collections import defaultdict
+from types import UnionType, GenericAlias, MappingProxyType
+from collections import abc, defaultdict
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar, Token, copy_context
+from functools import partial
 from enum import Enum
+from threading import Lock, Thread, get_ident
+import asyncio
+import inspect
+import os
+
+from applipy_inject.memory import MemoryTracker, MemoryUsage
+from applipy_inject.shared import shared_directory, shared_payload, shared_payload_path
 
 
 T = TypeVar('T')
@@ -46,6 +64,59 @@ def _is_type(t: Any) -> bool:
     return isinstance(t, type) or isinstance(t, GenericAlias)
 
 
+def _is_template(t: Any) -> bool:
+    if type(t) is type:
+        return False
+    return get_origin(t) is not None and bool(getattr(t, '__parameters__', ()))
+
+
+def _match_template(template: Any, type_: Any, substitutions: dict[Any, Any]) -> bool:
+    if isinstance(template, TypeVar):
+        if template in substitutions:
+            return bool(substitutions[template] == type_)
+        substitutions[template] = type_
+        return True
+    if not _is_template(template):
+        return bool(template == type_)
+    template_args = get_args(template)
+    args = get_args(type_)
+    return (
+        get_origin(template) is get_origin(type_)
+        and len(template_args) == len(args)
+        and all(_match_template(t, a, substitutions) for t, a in zip(template_args, args))
+    )
+
+
+def _substitute(type_: Any, substitutions: dict[Any, Any]) -> Any:
+    if isinstance(type_, TypeVar):
+        return substitutions.get(type_, type_)
+    if _is_template(type_):
+        return type_[tuple(substitutions.get(p, p) for p in type_.__parameters__)]
+    return type_
+
+
+def _positional_call(callable_: Callable[..., T],
+                     static: dict[str, object],
+                     arguments: List[str]) -> Optional[Callable[..., T]]:
+    # When the factory arguments follow the static dependencies in the
+    # signature of the provider, they can be passed positionally to a partial
+    # holding the static dependencies, which costs about the same as calling
+    # the provider directly.
+    try:
+        parameters = [parameter.name for parameter in inspect.signature(callable_).parameters.values()
+                      if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)]
+    except (TypeError, ValueError):
+        return None
+    leading = 0
+    while leading < len(parameters) and parameters[leading] in static:
+        leading += 1
+    if parameters[leading:leading + len(arguments)] != arguments:
+        return None
+    return partial(callable_,
+                   *(static[parameter] for parameter in parameters[:leading]),
+                   **{varname: value for varname, value in static.items() if varname not in parameters[:leading]})
+
+
 class name:
     value: str
 
@@ -100,6 +171,7 @@ def with_names(provider: Callable[..., T], name: Union[dict[str, str], str]) ->
             annotations[k] = Annotated[v, _Name(n)]
 
     setattr(wrapper, '__annotations__', annotations)
+    setattr(wrapper, '__wrapped__', provider)
     return wrapper
 
 
@@ -122,21 +194,86 @@ class Dependency:
     type_: type
     varname: str
     dep_type: DependencyType
+    deferred: bool
 
-    def __init__(self, name: Optional[str], type_: type, varname: str, dep_type: DependencyType) -> None:
+    def __init__(self,
+                 name: Optional[str],
+                 type_: type,
+                 varname: str,
+                 dep_type: DependencyType,
+                 deferred: bool = False) -> None:
         self.name = name
         self.type_ = type_
         self.varname = varname
         self.dep_type = dep_type
+        self.deferred = deferred
+
+
+class ProviderType(Enum):
+    Function = 'function'
+    Generator = 'generator'
+    Coroutine = 'coroutine'
+    AsyncGenerator = 'async_generator'
+
+
+def _get_provider_type(callable_: Callable[..., Any]) -> ProviderType:
+    function = inspect.unwrap(callable_)
+    if inspect.isasyncgenfunction(function):
+        return ProviderType.AsyncGenerator
+    elif inspect.iscoroutinefunction(function):
+        return ProviderType.Coroutine
+    elif inspect.isgeneratorfunction(function):
+        return ProviderType.Generator
+    else:
+        return ProviderType.Function
+
+
+def _get_return_type(provider: Callable[..., Any]) -> Any:
+    return_type = get_type_hints(provider).get('return')
+    if _get_provider_type(provider) in (ProviderType.Generator, ProviderType.AsyncGenerator):
+        if get_origin(return_type) in (abc.Iterator, abc.Iterable, abc.Generator,
+                                       abc.AsyncIterator, abc.AsyncIterable, abc.AsyncGenerator):
+            return get_args(return_type)[0]
+    return return_type
+
+
+def _exit_generator(generator: Generator[Any, None, None]) -> None:
+    try:
+        next(generator)
+    except StopIteration:
+        return
+    raise RuntimeError(f'Generator provider `{generator}` did not stop')
+
+
+async def _exit_async_generator(generator: AsyncGenerator[Any, None]) -> None:
+    try:
+        await generator.__anext__()
+    except StopAsyncIteration:
+        return
+    raise RuntimeError(f'Async generator provider `{generator}` did not stop')
+
+
+_Exit = Callable[[], Optional[Awaitable[None]]]
+_Key = Tuple[Optional[str], type]
+_MERGE_THRESHOLD = 64
 
 
 class Provider(Generic[T_Co]):
 
     dependencies: Iterable[Dependency]
+    provider_type: ProviderType
 
-    def __init__(self, callable_: Callable[..., T_Co], dependencies: Iterable[Dependency]) -> None:
+    def __init__(self,
+                 callable_: Callable[..., T_Co],
+                 dependencies: Iterable[Dependency],
+                 provider_type: Optional[ProviderType] = None) -> None:
         self.callable_: Callable[..., T_Co] = callable_
         self.dependencies = dependencies
+        self.provider_type = provider_type or _get_provider_type(callable_)
+
+    @property
+    def is_async(self) -> bool:
+        return self.provider_type in (ProviderType.Coroutine, ProviderType.AsyncGenerator)
 
     def __repr__(self) -> str:
         return f'{self.__class__}[{self.callable_}]'
@@ -148,6 +285,10 @@ class Item(Generic[T_Co]):
     provider: Provider[T_Co]
     is_singleton: bool
     instance: Optional[T_Co]
+    lock: Lock
+    pending: Optional['Future[Tuple[Any, FrozenSet[_Disposal]]]']
+    builder: Optional[int]
+    builder_is_async: bool
 
     def __init__(self,
                  name: Optional[str],
@@ -158,23 +299,298 @@ class Item(Generic[T_Co]):
         self.provider = provider
         self.is_singleton = is_singleton
         self.instance = instance
+        self.lock = Lock()
+        self.pending = None
+        self.builder = None
+        self.builder_is_async = False
 
     def instantiate(self, *args: Any, **kwargs: Any) -> T_Co:
-        instance = self.provider.callable_(*args, **kwargs)
+        instance, _ = self.enter(*args, **kwargs)
         if self.is_singleton:
             self.instance = instance
         return instance
 
+    def enter(self, *args: Any, **kwargs: Any) -> Tuple[T_Co, Optional[_Exit]]:
+        exit_: Optional[_Exit] = None
+        if self.provider.provider_type == ProviderType.Function:
+            instance = self.provider.callable_(*args, **kwargs)
+        elif self.provider.provider_type == ProviderType.Generator:
+            generator = cast(Generator[T_Co, None, None], self.provider.callable_(*args, **kwargs))
+            instance = next(generator)
+            exit_ = partial(_exit_generator, generator)
+        else:
+            raise TypeError(f'Provider `{self.provider.callable_}` is asynchronous and can only be used with `aget()`')
+        return instance, exit_
+
+    async def aenter(self, *args: Any, **kwargs: Any) -> Tuple[T_Co, Optional[_Exit]]:
+        if not self.provider.is_async:
+            return self.enter(*args, **kwargs)
+
+        exit_: Optional[_Exit] = None
+        if self.provider.provider_type == ProviderType.Coroutine:
+            instance = await cast(Awaitable[T_Co], self.provider.callable_(*args, **kwargs))
+        else:
+            generator = cast(AsyncGenerator[T_Co, None], self.provider.callable_(*args, **kwargs))
+            instance = await generator.__anext__()
+            exit_ = partial(_exit_async_generator, generator)
+        return instance, exit_
+
     def __repr__(self) -> str:
         return f'{self.__class__}[{self.name}, {self.provider}]'
 
 
-class Injector:
+class _Disposal:
+
+    exit_: _Exit
+    is_async: bool
+    dependencies: FrozenSet['_Disposal']
+    item: Item[Any]
+
+    def __init__(self, exit_: _Exit, is_async: bool, dependencies: FrozenSet['_Disposal'], item: Item[Any]) -> None:
+        self.exit_ = exit_
+        self.is_async = is_async
+        self.dependencies = dependencies
+        self.item = item
+
+
+def _dispose(disposals: List[_Disposal]) -> List[BaseException]:
+    dependents = {disposal: 0 for disposal in disposals}
+    for disposal in disposals:
+        for dependency in disposal.dependencies:
+            if dependency in dependents:
+                dependents[dependency] += 1
+
+    errors: List[BaseException] = []
+    with ThreadPoolExecutor() as executor:
+        running = {executor.submit(disposal.exit_): disposal
+                   for disposal in disposals if dependents[disposal] == 0}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                disposal = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    errors.append(error)
+                for dependency in disposal.dependencies:
+                    if dependency in dependents:
+                        dependents[dependency] -= 1
+                        if dependents[dependency] == 0:
+                            running[executor.submit(dependency.exit_)] = dependency
+    return errors
+
+
+async def _adispose(disposals: List[_Disposal]) -> List[BaseException]:
+    dependents: dict[_Disposal, List[_Disposal]] = {disposal: [] for disposal in disposals}
+    for disposal in disposals:
+        for dependency in disposal.dependencies:
+            if dependency in dependents:
+                dependents[dependency].append(disposal)
+
+    tasks: dict[_Disposal, asyncio.Task[None]] = {}
+
+    async def dispose(disposal: _Disposal) -> None:
+        await asyncio.gather(*(tasks[d] for d in dependents[disposal]), return_exceptions=True)
+        if disposal.is_async:
+            await cast(Awaitable[None], disposal.exit_())
+        else:
+            await asyncio.to_thread(disposal.exit_)
+
+    for disposal in disposals:
+        tasks[disposal] = asyncio.create_task(dispose(disposal))
+
+    results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    return [result for result in results if isinstance(result, BaseException)]
+
 
-    providers: dict[Tuple[Optional[str], type], Set[Item[object]]]
+class Scope:
+
+    _disposals: List[_Disposal]
+    _lock: Lock
+    _tokens: List['Token[Optional[Scope]]']
 
     def __init__(self) -> None:
-        self.providers = defaultdict(set)
+        self._disposals = []
+        self._lock = Lock()
+        self._tokens = []
+
+    def _add(self, disposal: _Disposal) -> None:
+        with self._lock:
+            self._disposals.append(disposal)
+
+    def _take_disposals(self) -> List[_Disposal]:
+        with self._lock:
+            disposals = self._disposals
+            self._disposals = []
+        return disposals
+
+    def __enter__(self) -> 'Scope':
+        self._tokens.append(_current_scope.set(self))
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        _current_scope.reset(self._tokens.pop())
+        self.close()
+
+    async def __aenter__(self) -> 'Scope':
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        _current_scope.reset(self._tokens.pop())
+        await self.aclose()
+
+    def close(self) -> None:
+        if any(disposal.is_async for disposal in self._disposals):
+            raise RuntimeError('There are asynchronous providers to close, use `aclose()` instead')
+        errors = _dispose(self._take_disposals())
+        if errors:
+            raise errors[0]
+
+    async def aclose(self) -> None:
+        errors = await _adispose(self._take_disposals())
+        if errors:
+            raise errors[0]
+
+
+_current_scope: ContextVar[Optional[Scope]] = ContextVar('applipy_inject_scope', default=None)
+
+
+class _Resolution:
+
+    requested: Set[Tuple[Optional[str], type]]
+    memo: Optional[dict[Item[Any], Tuple[Any, FrozenSet[_Disposal]]]]
+    disposals: Set[_Disposal]
+    scope: Optional[Scope]
+    offload: bool
+
+    def __init__(self, requested: Iterable[Tuple[Optional[str], type]] = (), memo: bool = False) -> None:
+        self.requested = set(requested)
+        self.memo = {} if memo else None
+        self.disposals = set()
+        self.scope = _current_scope.get()
+        self.offload = False
+
+    def fork(self) -> '_Resolution':
+        fork = _Resolution(self.requested)
+        fork.memo = self.memo
+        fork.scope = self.scope
+        fork.offload = self.offload
+        return fork
+
+
+class Injector:
+
+    _registry: Tuple[dict[_Key, Tuple[Item[object], ...]], dict[_Key, Tuple[Item[object], ...]]]
+    _templates: dict[Tuple[Optional[str], Any], Tuple[Tuple[Any, Item[object]], ...]]
+    _specializations: dict[Tuple[Optional[str], type], Tuple[Item[object], ...]]
+    _write_lock: Lock
+    _disposals: List[_Disposal]
+    _singleton_disposals: dict[Item[Any], FrozenSet[_Disposal]]
+    _memory: Optional[MemoryTracker]
+    _parallel_collections: bool
+    _executor: Optional[Executor]
+    _owns_executor: bool
+
+    def __init__(self, *, parallel_collections: bool = False, executor: Optional[Executor] = None) -> None:
+        self._registry = ({}, {})
+        self._templates = {}
+        self._specializations = {}
+        self._write_lock = Lock()
+        self._disposals = []
+        self._singleton_disposals = {}
+        self._memory = None
+        self._parallel_collections = parallel_collections
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    @property
+    def providers(self) -> Mapping[Tuple[Optional[str], type], Tuple[Item[object], ...]]:
+        providers, recent = self._registry
+        if recent:
+            with self._write_lock:
+                providers, recent = self._registry
+                if recent:
+                    providers = {**providers, **recent}
+                    self._registry = (providers, {})
+        return MappingProxyType(providers)
+
+    def _register(self, types: Iterable[type], name: Optional[str], item: Item[object]) -> None:
+        with self._write_lock:
+            # The registry is never modified once published. New bindings are
+            # added to a copy of the small dictionary of recent bindings, that
+            # is merged into the rest once it grows past the square root of
+            # its size, so binding copies O(sqrt(n)) entries amortized instead
+            # of the whole registry. More levels would copy less, but every
+            # read would have to look them all up.
+            providers, recent = self._registry
+            recent = dict(recent)
+            for type_ in types:
+                if _is_template(type_):
+                    self._register_template(type_, name, item)
+                else:
+                    key = (name, type_)
+                    items = recent[key] if key in recent else providers.get(key, ())
+                    if item not in items:
+                        recent[key] = items + (item,)
+            if len(recent) > max(_MERGE_THRESHOLD, int(len(providers) ** 0.5)):
+                providers, recent = {**providers, **recent}, {}
+            self._registry = (providers, recent)
+
+    def _register_template(self, type_: Any, name: Optional[str], item: Item[object]) -> None:
+        template_key = (name, get_origin(type_))
+        specializations = dict(self._specializations)
+        for key, specialized in self._specializations.items():
+            if key[0] == name and get_origin(key[1]) is template_key[1]:
+                specializations[key] = specialized + self._specialize_item(type_, item, key[1])
+        self._templates = {**self._templates, template_key: self._templates.get(template_key, ()) + ((type_, item),)}
+        self._specializations = specializations
+
+    def _get_items(self, key: Tuple[Optional[str], type]) -> Tuple[Item[object], ...]:
+        providers, recent = self._registry
+        items = recent.get(key)
+        if items is None:
+            items = providers.get(key)
+        if items is None and self._templates:
+            items = self._specializations.get(key)
+            if items is None:
+                items = self._specialize(key)
+        return items or ()
+
+    def _specialize(self, key: Tuple[Optional[str], type]) -> Tuple[Item[object], ...]:
+        name, type_ = key
+        templates = self._templates.get((name, get_origin(type_)), ())
+        if not templates:
+            return ()
+        with self._write_lock:
+            items = self._specializations.get(key)
+            if items is None:
+                items = ()
+                for template, item in templates:
+                    items += self._specialize_item(template, item, type_)
+                self._specializations = {**self._specializations, key: items}
+        return items
+
+    def _specialize_item(self, template: Any, item: Item[object], type_: type) -> Tuple[Item[object], ...]:
+        substitutions: dict[Any, Any] = {}
+        if not _match_template(template, type_, substitutions):
+            return ()
+
+        classes: dict[str, Any] = {}
+        dependencies: List[Dependency] = []
+        for dependency in item.provider.dependencies:
+            if get_origin(dependency.type_) is type and _is_template(dependency.type_):
+                classes[dependency.varname] = _substitute(get_args(dependency.type_)[0], substitutions)
+            else:
+                dependencies.append(Dependency(dependency.name,
+                                               _substitute(dependency.type_, substitutions),
+                                               dependency.varname,
+                                               dependency.dep_type,
+                                               dependency.deferred))
+
+        callable_ = item.provider.callable_
+        provider = Provider(partial(callable_, **classes) if classes else callable_,
+                            dependencies,
+                            item.provider.provider_type)
+        return (Item(item.name, provider, item.is_singleton),)
 
     def _dependency_is_collection(self, dep_type: type) -> bool:
         origin = get_origin(dep_type)
@@ -231,7 +647,7 @@ class Injector:
                 callable(provider_or_instance)
                 and
                 issubclass(
-                    cast(type, get_type_hints(provider_or_instance).get('return')),
+                    cast(type, _get_return_type(provider_or_instance)),
                     type_
                 )
             )
@@ -283,12 +699,25 @@ class Injector:
              name: Optional[str] = None,
              singleton: bool = True) -> None:
         if provider_or_instance is None:
-            if _is_type(type_):
+            if _is_template(type_):
+                self.bind_provider(cast(Type[T], type_),
+                                   cast(Type[T], get_origin(type_)),
+                                   name=name,
+                                   singleton=singleton)
+            elif _is_type(type_):
                 self.bind_type(cast(type, type_), name=name, singleton=singleton)
-            elif callable(type_) and _is_type(get_type_hints(type_).get('return')):
-                self.bind_provider(get_type_hints(type_)['return'], type_, name=name, singleton=singleton)
+            elif callable(type_) and (_is_type(_get_return_type(type_)) or _is_template(_get_return_type(type_))):
+                self.bind_provider(_get_return_type(type_), type_, name=name, singleton=singleton)
             else:
                 raise TypeError('Cannot bind {}. Please be more explicit'.format(type_))
+        elif (
+            callable(provider_or_instance)
+            and any(_is_template(t) for t in (type_ if isinstance(type_, (tuple, list)) else (type_,)))
+        ):
+            self.bind_provider(cast(Union[Type[T], Tuple[type, ...], List[type]], type_),
+                               cast(Callable[..., T], provider_or_instance),
+                               name=name,
+                               singleton=singleton)
         elif self._is_provider(provider_or_instance, type_):
             self.bind_provider(cast(Union[Type[T], Tuple[type, ...], List[type]], type_),
                                cast(Callable[..., T], provider_or_instance),
@@ -305,15 +734,20 @@ class Injector:
                       /, *,
                       name: Optional[str] = None,
                       singleton: bool = True) -> None:
-        func: Callable[..., T]
+        if not isinstance(types, (tuple, list)):
+            types = (types,)
+
+        item = Item[T](name, Provider(provider, self._get_dependencies(provider)), singleton)
+
+        self._register(types, name, item)
+
+    def _get_dependencies(self, provider: Callable[..., Any]) -> List[Dependency]:
+        func: Callable[..., Any]
         if _is_type(provider):
-            func = cast(Callable[..., T], getattr(provider, '__init__'))
+            func = cast(Callable[..., Any], getattr(provider, '__init__'))
         else:
             func = provider
 
-        if not isinstance(types, (tuple, list)):
-            types = (types,)
-
         annotations = get_type_hints(func, include_extras=True).copy()
         if 'return' in annotations:
             del annotations['return']
@@ -334,10 +768,35 @@ class Injector:
                                            var,
                                            self._get_dependency_type(typ)))
 
-        item = Item[T](name, Provider(provider, dependencies), singleton)
+        return dependencies
 
-        for type_ in types:
-            self.providers[name, type_].add(item)
+    def bind_shared(self,
+                    types: Union[type, Tuple[type, ...], List[type]],
+                    provider: Callable[..., Any],
+                    /, *,
+                    name: Optional[str] = None,
+                    key: Optional[str] = None,
+                    loads: Optional[Callable[[memoryview], Any]] = None) -> None:
+        if not isinstance(types, (tuple, list)):
+            types = (types,)
+        if key is None:
+            path = shared_payload_path(name, ','.join(_get_class_name(t) for t in types))
+        else:
+            path = os.path.join(shared_directory(), key)
+
+        # The dependencies of the provider are deferred: they are only resolved,
+        # by the injector getting the payload, if the payload has to be built.
+        def provide_shared(**dependencies: Callable[[], object]) -> Iterator[Any]:
+            def build() -> Any:
+                return provider(**{varname: get() for varname, get in dependencies.items()})
+
+            with shared_payload(path, build) as view:
+                yield view if loads is None else loads(view)
+
+        dependencies = [Dependency(dependency.name, dependency.type_, dependency.varname, dependency.dep_type, True)
+                        for dependency in self._get_dependencies(provider)]
+        item = Item[object](name, Provider(provide_shared, dependencies, ProviderType.Generator), True)
+        self._register(types, name, item)
 
     def bind_type(self,
                   type_: type,
@@ -351,71 +810,232 @@ class Injector:
                       instance: T,
                       /, *,
                       name: Optional[str] = None) -> None:
-        item = Item[T](name, Provider(lambda: instance, ()), True, instance=instance)
+        item = Item[T](name, Provider(lambda: instance, (), ProviderType.Function), True, instance=instance)
 
         if not isinstance(types, (tuple, list)):
             types = (types,)
-        for type_ in types:
-            self.providers[name, type_].add(item)
+        if any(_is_template(t) for t in types):
+            raise TypeError(f'Cannot bind instance `{instance!r}` to a generic type, bind a provider instead')
+        self._register(types, name, item)
 
     def get_all(self,
                 type_: Type[T],
                 name: Optional[str] = None,
-                _requested: Optional[Set[Tuple[Optional[str], type]]] = None,
+                _resolution: Optional[_Resolution] = None,
                 _max: Optional[int] = None) -> List[T]:
-        requested = _requested or set()
-        request_key = (name, type_)
-        if request_key in requested:
-            raise TypeError(f'There is a dependency cycle for type `{_get_class_name(type_)}` with name `{name}`')
-        requested.add(request_key)
+        resolution = _resolution or _Resolution()
+        request_key = self._enter_request(resolution, type_, name)
+
+        items = cast(Tuple[Item[T], ...], self._get_items(request_key))
 
-        items = cast(Set[Item[T]], self.providers[name, type_])
+        if _max is None and self._is_parallel(items):
+            instances = self._provide_parallel(items, type_, name, resolution)
+            resolution.requested.remove(request_key)
+            return instances
 
         instances_left = len(items) if _max is None else _max
 
-        instances: List[T] = []
+        instances = []
 
         for item in items:
-            if item.instance is not None:
-                instance = item.instance
-            else:
-                dependencies: dict[str, Union[List[object], Optional[object], object]] = {}
-                for dependency in item.provider.dependencies:
-                    if dependency.dep_type == DependencyType.Collection:
-                        dependencies[dependency.varname] = self.get_all(dependency.type_,
-                                                                        name=dependency.name,
-                                                                        _requested=requested)
-                    elif dependency.dep_type == DependencyType.Optional:
-                        dep: Any = self.get_optional(dependency.type_,
-                                                     name=dependency.name,
-                                                     _requested=requested)
-                        dependencies[dependency.varname] = dep
-                    else:
-                        dependencies[dependency.varname] = self.get(dependency.type_,
-                                                                    name=dependency.name,
-                                                                    _requested=requested)
-                try:
-                    instance = item.instantiate(**dependencies)
-                except TypeError:
-                    raise TypeError(
-                        f'Error when calling provider `{item.provider.callable_}` '
-                        f'for type `{_get_class_name(type_)}` with name `{name}`'
-                    )
-
-            instances.append(instance)
+            instances.append(self._provide(item, type_, name, resolution))
 
             instances_left -= 1
             if instances_left == 0:
                 break
 
-        requested.remove(request_key)
+        resolution.requested.remove(request_key)
+        return instances
+
+    def _is_parallel(self, items: Tuple[Item[Any], ...]) -> bool:
+        # Memory tracking runs providers one at a time anyway, and the workers
+        # would wait for the lock held by the provider getting the collection.
+        return (
+            self._parallel_collections
+            and self._memory is None
+            and sum(1 for i in items if i.instance is None) > 1
+        )
+
+    def _provide_parallel(self,
+                          items: Tuple[Item[T], ...],
+                          type_: Type[T],
+                          name: Optional[str],
+                          resolution: _Resolution) -> List[T]:
+        executor = self._get_executor()
+        forks: List[_Resolution] = []
+        futures: List[Optional[Future[T]]] = []
+        for item in items:
+            if item.instance is None:
+                fork = resolution.fork()
+                forks.append(fork)
+                futures.append(executor.submit(copy_context().run, self._provide, item, type_, name, fork))
+            else:
+                futures.append(None)
+
+        # Items that no worker has started yet are instantiated by this thread
+        # instead of waiting, so nested collections cannot starve the executor.
+        instances: List[T] = []
+        for item, future in zip(items, futures):
+            if future is None or future.cancel():
+                instances.append(self._provide(item, type_, name, resolution))
+            else:
+                instances.append(future.result())
+
+        for fork in forks:
+            resolution.disposals.update(fork.disposals)
         return instances
 
+    def _get_executor(self) -> Executor:
+        executor = self._executor
+        if executor is None:
+            with self._write_lock:
+                executor = self._executor
+                if executor is None:
+                    executor = self._executor = ThreadPoolExecutor(thread_name_prefix='applipy_inject')
+        return executor
+
+    def _enter_request(self, resolution: _Resolution, type_: type, name: Optional[str]) -> Tuple[Optional[str], type]:
+        request_key = (name, type_)
+        if request_key in resolution.requested:
+            raise TypeError(f'There is a dependency cycle for type `{_get_class_name(type_)}` with name `{name}`')
+        resolution.requested.add(request_key)
+        return request_key
+
+    def _provide(self, item: Item[T], type_: Type[T], name: Optional[str], resolution: _Resolution) -> T:
+        instance = item.instance
+        if instance is not None:
+            if self._singleton_disposals:
+                resolution.disposals.update(self._singleton_disposals.get(item, ()))
+            return instance
+
+        if item.is_singleton:
+            pending, is_builder = self._claim_singleton(item, type_, name, is_async=False)
+            if pending is None:
+                instance = item.instance
+                disposals = self._singleton_disposals.get(item, frozenset())
+            elif is_builder:
+                with self._building_singleton(item, pending, resolution):
+                    instance, disposals = self._instantiate(item, type_, name, resolution)
+                    self._set_singleton(item, instance, disposals)
+                    pending.set_result((instance, disposals))
+            elif self._memory is None:
+                instance, disposals = pending.result()
+            else:
+                with self._memory.waiting():
+                    instance, disposals = pending.result()
+        elif resolution.memo is not None and item in resolution.memo:
+            instance, disposals = resolution.memo[item]
+        else:
+            instance, disposals = self._instantiate(item, type_, name, resolution)
+            if resolution.memo is not None:
+                resolution.memo[item] = (instance, disposals)
+
+        resolution.disposals.update(disposals)
+        return cast(T, instance)
+
+    def _instantiate(self,
+                     item: Item[T],
+                     type_: Type[T],
+                     name: Optional[str],
+                     resolution: _Resolution) -> Tuple[T, FrozenSet[_Disposal]]:
+        if item.provider.is_async:
+            raise TypeError(f'Provider `{item.provider.callable_}` for type `{_get_class_name(type_)}` '
+                            f'with name `{name}` is asynchronous and can only be used with `aget()`')
+
+        outer_disposals = resolution.disposals
+        resolution.disposals = set()
+        try:
+            dependencies = {dependency.varname: self._get_dependency(dependency, resolution)
+                            for dependency in item.provider.dependencies}
+            # Deferred dependencies are resolved while the provider runs, so
+            # their disposals are collected until it returns.
+            try:
+                if self._memory is None:
+                    instance, exit_ = item.enter(**dependencies)
+                else:
+                    with self._memory.track((name, type_), item):
+                        instance, exit_ = item.enter(**dependencies)
+            except TypeError as e:
+                raise TypeError(
+                    f'Error when calling provider `{item.provider.callable_}` '
+                    f'for type `{_get_class_name(type_)}` with name `{name}`'
+                ) from e
+            dependency_disposals = frozenset(resolution.disposals)
+        finally:
+            resolution.disposals = outer_disposals
+
+        return instance, self._track_disposal(item, exit_, dependency_disposals, resolution)
+
+    def _track_disposal(self,
+                        item: Item[Any],
+                        exit_: Optional[_Exit],
+                        dependency_disposals: FrozenSet[_Disposal],
+                        resolution: _Resolution) -> FrozenSet[_Disposal]:
+        if exit_ is None:
+            return dependency_disposals
+        disposal = _Disposal(exit_, item.provider.is_async, dependency_disposals, item)
+        if resolution.scope is not None:
+            resolution.scope._add(disposal)
+        else:
+            with self._write_lock:
+                self._disposals.append(disposal)
+        return frozenset((disposal,))
+
+    def _claim_singleton(self,
+                         item: Item[Any],
+                         type_: type,
+                         name: Optional[str],
+                         is_async: bool) -> Tuple[Optional['Future[Tuple[Any, FrozenSet[_Disposal]]]'], bool]:
+        with item.lock:
+            if item.instance is not None:
+                return None, False
+            if item.pending is not None:
+                # Waiting synchronously in the thread that is building the
+                # instance would never finish. Asynchronous builds share the
+                # thread of their event loop, so in their case it is not a
+                # cycle but a synchronous get while the event loop awaits it.
+                if not is_async and item.builder == get_ident():
+                    if item.builder_is_async:
+                        raise TypeError(f'The instance of type `{_get_class_name(type_)}` with name `{name}` is '
+                                        f'being built asynchronously, use `aget()` to wait for it')
+                    raise TypeError(f'There is a dependency cycle for type `{_get_class_name(type_)}` '
+                                    f'with name `{name}`')
+                return item.pending, False
+            item.pending = Future()
+            item.builder = get_ident()
+            item.builder_is_async = is_async
+            return item.pending, True
+
+    @contextmanager
+    def _building_singleton(self,
+                            item: Item[Any],
+                            pending: 'Future[Tuple[Any, FrozenSet[_Disposal]]]',
+                            resolution: _Resolution) -> Iterator[None]:
+        # Singletons, and the instances they depend on, live as long as the
+        # injector, even when they are instantiated inside a scope.
+        scope = resolution.scope
+        resolution.scope = None
+        try:
+            yield
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            resolution.scope = scope
+            with item.lock:
+                item.pending = None
+                item.builder = None
+
+    def _set_singleton(self, item: Item[T], instance: T, disposals: FrozenSet[_Disposal]) -> None:
+        if disposals:
+            self._singleton_disposals[item] = disposals
+        item.instance = instance
+
     def get_optional(self,
                      type_: Type[T],
                      name: Optional[str] = None,
-                     _requested: Optional[Set[Tuple[Optional[str], type]]] = None) -> Optional[T]:
-        found = self.get_all(type_, name=name, _requested=_requested, _max=1)
+                     _resolution: Optional[_Resolution] = None) -> Optional[T]:
+        found = self.get_all(type_, name=name, _resolution=_resolution, _max=1)
         if found:
             return found[0]
         return None
@@ -423,8 +1043,388 @@ class Injector:
     def get(self,
             type_: Type[T],
             name: Optional[str] = None,
-            _requested: Optional[Set[Tuple[Optional[str], type]]] = None) -> T:
-        instance = self.get_optional(type_, name=name, _requested=_requested)
+            _resolution: Optional[_Resolution] = None) -> T:
+        instance = self.get_optional(type_, name=name, _resolution=_resolution)
         if instance is None:
             raise ValueError(f'Could not get instance of type `{_get_class_name(type_)}` with name `{name}`')
         return instance
+
+    async def aget_all(self,
+                       type_: Type[T],
+                       name: Optional[str] = None,
+                       _resolution: Optional[_Resolution] = None,
+                       _max: Optional[int] = None) -> List[T]:
+        resolution = _resolution or _Resolution()
+        request_key = self._enter_request(resolution, type_, name)
+
+        items = cast(Tuple[Item[T], ...], self._get_items(request_key))
+
+        if _max is None and self._is_parallel(items):
+            forks = [resolution.fork() for _ in items]
+            for fork in forks:
+                fork.offload = True
+            instances = list(await asyncio.gather(*(self._aprovide(item, type_, name, fork)
+                                                    for item, fork in zip(items, forks))))
+            for fork in forks:
+                resolution.disposals.update(fork.disposals)
+            resolution.requested.remove(request_key)
+            return instances
+
+        instances_left = len(items) if _max is None else _max
+
+        instances = []
+
+        for item in items:
+            instances.append(await self._aprovide(item, type_, name, resolution))
+
+            instances_left -= 1
+            if instances_left == 0:
+                break
+
+        resolution.requested.remove(request_key)
+        return instances
+
+    async def _aprovide(self, item: Item[T], type_: Type[T], name: Optional[str], resolution: _Resolution) -> T:
+        instance = item.instance
+        if instance is not None:
+            if self._singleton_disposals:
+                resolution.disposals.update(self._singleton_disposals.get(item, ()))
+            return instance
+
+        if item.is_singleton:
+            pending, is_builder = self._claim_singleton(item, type_, name, is_async=True)
+            if pending is None:
+                instance = item.instance
+                disposals = self._singleton_disposals.get(item, frozenset())
+            elif is_builder:
+                with self._building_singleton(item, pending, resolution):
+                    instance, disposals = await self._ainstantiate(item, type_, name, resolution)
+                    self._set_singleton(item, instance, disposals)
+                    pending.set_result((instance, disposals))
+            elif self._memory is None:
+                instance, disposals = await asyncio.wrap_future(pending)
+            else:
+                async with self._memory.awaiting():
+                    instance, disposals = await asyncio.wrap_future(pending)
+        elif resolution.memo is not None and item in resolution.memo:
+            instance, disposals = resolution.memo[item]
+        else:
+            instance, disposals = await self._ainstantiate(item, type_, name, resolution)
+            if resolution.memo is not None:
+                resolution.memo[item] = (instance, disposals)
+
+        resolution.disposals.update(disposals)
+        return cast(T, instance)
+
+    async def _ainstantiate(self,
+                            item: Item[T],
+                            type_: Type[T],
+                            name: Optional[str],
+                            resolution: _Resolution) -> Tuple[T, FrozenSet[_Disposal]]:
+        outer_disposals = resolution.disposals
+        resolution.disposals = set()
+        try:
+            dependencies = {}
+            for dependency in item.provider.dependencies:
+                dependencies[dependency.varname] = await self._aget_dependency(dependency, resolution)
+            try:
+                if self._memory is None:
+                    instance, exit_ = await self._aenter(item, dependencies, resolution)
+                else:
+                    async with self._memory.atrack((name, type_), item):
+                        instance, exit_ = await self._aenter(item, dependencies, resolution)
+            except TypeError as e:
+                raise TypeError(
+                    f'Error when calling provider `{item.provider.callable_}` '
+                    f'for type `{_get_class_name(type_)}` with name `{name}`'
+                ) from e
+            dependency_disposals = frozenset(resolution.disposals)
+        finally:
+            resolution.disposals = outer_disposals
+
+        return instance, self._track_disposal(item, exit_, dependency_disposals, resolution)
+
+    async def _aenter(self,
+                      item: Item[T],
+                      dependencies: dict[str, object],
+                      resolution: _Resolution) -> Tuple[T, Optional[_Exit]]:
+        # Synchronous providers would block the event loop, so the ones that
+        # are instantiated concurrently run on the executor instead.
+        if resolution.offload and not item.provider.is_async:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(),
+                                              partial(copy_context().run, item.enter, **dependencies))
+        return await item.aenter(**dependencies)
+
+    async def aget_optional(self,
+                            type_: Type[T],
+                            name: Optional[str] = None,
+                            _resolution: Optional[_Resolution] = None) -> Optional[T]:
+        found = await self.aget_all(type_, name=name, _resolution=_resolution, _max=1)
+        if found:
+            return found[0]
+        return None
+
+    async def aget(self,
+                   type_: Type[T],
+                   name: Optional[str] = None,
+                   _resolution: Optional[_Resolution] = None) -> T:
+        instance = await self.aget_optional(type_, name=name, _resolution=_resolution)
+        if instance is None:
+            raise ValueError(f'Could not get instance of type `{_get_class_name(type_)}` with name `{name}`')
+        return instance
+
+    def get_many(self, keys: Iterable[Tuple[type, Optional[str]]]) -> List[Any]:
+        resolution = _Resolution(memo=True)
+        return [self.get(type_, name=name, _resolution=resolution) for type_, name in keys]
+
+    def get_factory(self,
+                    type_: Type[T],
+                    name: Optional[str] = None,
+                    *,
+                    arguments: Iterable[str] = ()) -> Callable[..., T]:
+        items = cast(Tuple[Item[T], ...], self._get_items((name, type_)))
+        if not items:
+            raise ValueError(f'Could not get factory of type `{_get_class_name(type_)}` with name `{name}`')
+        if items[0].provider.provider_type != ProviderType.Function:
+            raise TypeError(f'Cannot get factory of type `{_get_class_name(type_)}` with name `{name}` '
+                            f'because its provider `{items[0].provider.callable_}` is not a plain function or type')
+        arguments = list(arguments)
+        varnames = {dependency.varname for dependency in items[0].provider.dependencies}
+        for argument in arguments:
+            if argument not in varnames:
+                raise TypeError(f'Provider `{items[0].provider.callable_}` for type `{_get_class_name(type_)}` '
+                                f'with name `{name}` has no argument `{argument}`')
+        return self._compile_factory(items[0], type_, name, set(), arguments)
+
+    def _compile_factory(self,
+                         item: Item[T],
+                         type_: Type[T],
+                         name: Optional[str],
+                         requested: Set[Tuple[Optional[str], type]],
+                         arguments: List[str]) -> Callable[..., T]:
+        request_key = (name, type_)
+        if request_key in requested:
+            raise TypeError(f'There is a dependency cycle for type `{_get_class_name(type_)}` with name `{name}`')
+        requested = requested | {request_key}
+
+        callable_ = item.provider.callable_
+        static: dict[str, object] = {}
+        dynamic: List[Tuple[str, Callable[[], object]]] = []
+
+        for dependency in item.provider.dependencies:
+            if dependency.varname in arguments:
+                continue
+            bound = self._get_items((dependency.name, dependency.type_))
+            if all(i.is_singleton for i in bound):
+                static[dependency.varname] = self._get_dependency(dependency, _Resolution(requested))
+            elif (
+                dependency.dep_type != DependencyType.Collection
+                and len(bound) == 1
+                and bound[0].provider.provider_type == ProviderType.Function
+            ):
+                dynamic.append((dependency.varname,
+                                self._compile_factory(bound[0],
+                                                      dependency.type_,
+                                                      dependency.name,
+                                                      requested,
+                                                      [])))
+            else:
+                dynamic.append((dependency.varname, self._dependency_getter(dependency, frozenset(requested))))
+
+        def map_arguments(args: Tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
+            if len(args) > len(arguments):
+                raise TypeError(f'Factory for type `{_get_class_name(type_)}` with name `{name}` takes '
+                                f'{len(arguments)} positional arguments but {len(args)} were given')
+            for argument, value in zip(arguments, args):
+                if argument in kwargs:
+                    raise TypeError(f'Factory for type `{_get_class_name(type_)}` with name `{name}` got '
+                                    f'multiple values for argument `{argument}`')
+                kwargs[argument] = value
+            return kwargs
+
+        call = _positional_call(callable_, static, arguments)
+        positional = len(arguments)
+
+        # Arguments given by the caller take precedence over the injected ones
+        def factory(*args: Any, **kwargs: Any) -> T:
+            if call is not None and not kwargs and len(args) == positional:
+                if dynamic:
+                    return call(*args, **{varname: get() for varname, get in dynamic})
+                return call(*args)
+            if args:
+                kwargs = map_arguments(args, kwargs)
+            for varname, get in dynamic:
+                if varname not in kwargs:
+                    kwargs[varname] = get()
+            return callable_(**{**static, **kwargs})
+
+        return factory
+
+    def _dependency_getter(self,
+                           dependency: Dependency,
+                           requested: AbstractSet[Tuple[Optional[str], type]]) -> Callable[[], object]:
+        def get() -> object:
+            return self._get_dependency(dependency, _Resolution(requested))
+
+        return get
+
+    def _get_dependency(self, dependency: Dependency, resolution: _Resolution) -> object:
+        if dependency.deferred:
+            return partial(self._resolve_dependency, dependency, resolution)
+        return self._resolve_dependency(dependency, resolution)
+
+    def _resolve_dependency(self, dependency: Dependency, resolution: _Resolution) -> object:
+        if dependency.dep_type == DependencyType.Collection:
+            return self.get_all(dependency.type_, name=dependency.name, _resolution=resolution)
+        elif dependency.dep_type == DependencyType.Optional:
+            return self.get_optional(dependency.type_, name=dependency.name, _resolution=resolution)
+        else:
+            return self.get(dependency.type_, name=dependency.name, _resolution=resolution)
+
+    async def _aget_dependency(self, dependency: Dependency, resolution: _Resolution) -> object:
+        if dependency.deferred:
+            return partial(self._resolve_dependency, dependency, resolution)
+        if dependency.dep_type == DependencyType.Collection:
+            return await self.aget_all(dependency.type_, name=dependency.name, _resolution=resolution)
+        elif dependency.dep_type == DependencyType.Optional:
+            return await self.aget_optional(dependency.type_, name=dependency.name, _resolution=resolution)
+        else:
+            return await self.aget(dependency.type_, name=dependency.name, _resolution=resolution)
+
+    def clone(self, include_singletons: bool = False) -> 'Injector':
+        clone = Injector(parallel_collections=self._parallel_collections,
+                         executor=None if self._owns_executor else self._executor)
+        providers = self.providers
+        with self._write_lock:
+            specializations = self._specializations
+            clone._templates = self._templates
+            # The original closes the singletons that have cleanup, so they
+            # are instantiated again by the clone.
+            disposable = set(self._singleton_disposals)
+
+        # Every item is copied, as each injector keeps its own singleton
+        # state, so cloning is linear in the number of bindings. Copying them
+        # lazily would add a lookup to every get().
+        copies: dict[Item[Any], Item[Any]] = {}
+
+        def copy(item: Item[Any]) -> Item[Any]:
+            copied = copies.get(item)
+            if copied is None:
+                instance = item.instance if include_singletons and item not in disposable else None
+                copied = copies[item] = Item(item.name, item.provider, item.is_singleton, instance)
+            return copied
+
+        clone._registry = ({key: tuple(copy(item) for item in items) for key, items in providers.items()}, {})
+        clone._specializations = {key: tuple(copy(item) for item in items)
+                                  for key, items in specializations.items()}
+        return clone
+
+    def snapshot(self) -> 'Injector':
+        return self.clone(include_singletons=True)
+
+    def prewarm_in_background(self,
+                              priority: Iterable[Tuple[type, Optional[str]]] = (),
+                              callback: Optional[Callable[['Future[None]'], None]] = None) -> 'Future[None]':
+        ready: Future[None] = Future()
+        if callback is not None:
+            ready.add_done_callback(callback)
+        Thread(target=self._prewarm,
+               args=(self._prewarm_order(priority), ready),
+               name='applipy_inject_prewarm',
+               daemon=True).start()
+        return ready
+
+    def _prewarm_order(self, priority: Iterable[Tuple[type, Optional[str]]]) -> List[Tuple[_Key, Item[Any]]]:
+        keys = [(name, type_) for type_, name in priority]
+        first = set(keys)
+        keys.extend(key for key in self.providers if key not in first)
+        is_async: dict[Item[Any], bool] = {}
+        seen: Set[Item[Any]] = set()
+        order = []
+        for key in keys:
+            for item in self._get_items(key):
+                if item.is_singleton and item not in seen and not self._needs_async(item, is_async):
+                    seen.add(item)
+                    order.append((key, item))
+        return order
+
+    def _needs_async(self, item: Item[Any], is_async: dict[Item[Any], bool]) -> bool:
+        if item not in is_async:
+            # Items in a dependency cycle are assumed synchronous until proven
+            # otherwise, getting them fails anyway.
+            is_async[item] = False
+            is_async[item] = item.instance is None and (
+                item.provider.is_async
+                or
+                any(self._needs_async(dependency_item, is_async)
+                    for dependency in item.provider.dependencies
+                    for dependency_item in self._get_items((dependency.name, dependency.type_)))
+            )
+        return is_async[item]
+
+    def _prewarm(self, order: List[Tuple[_Key, Item[Any]]], ready: 'Future[None]') -> None:
+        if not ready.set_running_or_notify_cancel():
+            return
+        error: Optional[BaseException] = None
+        for (name, type_), item in order:
+            if item.instance is not None:
+                continue
+            try:
+                self._provide(item, type_, name, _Resolution(((name, type_),)))
+            except Exception as e:
+                error = error or e
+        if error is None:
+            ready.set_result(None)
+        else:
+            ready.set_exception(error)
+
+    def scope(self) -> Scope:
+        return Scope()
+
+    def close(self) -> None:
+        if any(disposal.is_async for disposal in self._disposals):
+            raise RuntimeError('There are asynchronous providers to close, use `aclose()` instead')
+        errors = _dispose(self._take_disposals())
+        self._shutdown_executor()
+        if errors:
+            raise errors[0]
+
+    async def aclose(self) -> None:
+        errors = await _adispose(self._take_disposals())
+        self._shutdown_executor()
+        if errors:
+            raise errors[0]
+
+    def _shutdown_executor(self) -> None:
+        with self._write_lock:
+            executor = self._executor if self._owns_executor else None
+            if executor is not None:
+                self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def start_memory_tracking(self) -> None:
+        if self._memory is None:
+            self._memory = MemoryTracker()
+
+    def stop_memory_tracking(self) -> None:
+        if self._memory is not None:
+            self._memory.stop()
+            self._memory = None
+
+    def memory_report(self) -> List[MemoryUsage]:
+        if self._memory is None:
+            raise RuntimeError('Memory tracking is not enabled, call `start_memory_tracking()` first')
+        return self._memory.report()
+
+    def _take_disposals(self) -> List[_Disposal]:
+        with self._write_lock:
+            disposals = self._disposals
+            self._disposals = []
+            closed = set(disposals)
+            for item, item_disposals in list(self._singleton_disposals.items()):
+                if closed.intersection(item_disposals):
+                    del self._singleton_disposals[item]
+                    item.instance = None
+        return disposals
@@ -0,0 +1,295 @@
+from contextlib import asynccontextmanager, contextmanager
+from collections import deque
+from contextvars import ContextVar
+from threading import Event, Lock
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+import asyncio
+import gc
+import sys
+import tracemalloc
+
+
+Key = Tuple[Optional[str], Any]
+
+
+class MemoryUsage:
+
+    key: Key
+    instantiations: int
+    allocated: int
+    retained: Optional[int]
+
+    def __init__(self, key: Key) -> None:
+        self.key = key
+        self.instantiations = 0
+        self.allocated = 0
+        self.retained = None
+
+    def __repr__(self) -> str:
+        return (f'{self.__class__.__name__}(key={self.key}, instantiations={self.instantiations}, '
+                f'allocated={self.allocated}, retained={self.retained})')
+
+
+class _Frame:
+
+    start: int
+    nested: int
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.nested = 0
+
+
+_SHARED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType)
+
+
+def retained_size(instance: object, exclude: Set[int]) -> int:
+    seen = set(exclude)
+    seen.discard(id(instance))
+    pending = [instance]
+    size = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return size
+
+
+# Lock that threads and asyncio tasks can wait for, in order of arrival,
+# without blocking an event loop. Releasing it hands it over to the next waiter.
+class _SerialLock:
+
+    _lock: Lock
+    _held: bool
+    _waiters: Deque[Callable[[], None]]
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._held = False
+        self._waiters = deque()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._held:
+                return False
+            self._held = True
+            return True
+
+    def acquire(self) -> None:
+        with self._lock:
+            if not self._held:
+                self._held = True
+                return
+            event = Event()
+            self._waiters.append(event.set)
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(_set_result, future)
+
+        with self._lock:
+            if not self._held:
+                self._held = True
+                return
+            self._waiters.append(wake)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if wake in self._waiters:
+                    self._waiters.remove(wake)
+                    raise
+            # It was handed over to this task before it was cancelled
+            self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft()()
+            else:
+                self._held = False
+
+
+def _set_result(future: 'asyncio.Future[None]') -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class MemoryTracker:
+
+    _usages: dict[Key, MemoryUsage]
+    _singletons: dict[Key, Any]
+    _lock: Lock
+    _frames: ContextVar[Tuple[_Frame, ...]]
+    _serial: _SerialLock
+    _async_owner: bool
+    _started_tracemalloc: bool
+
+    def __init__(self) -> None:
+        self._usages = {}
+        self._singletons = {}
+        self._lock = Lock()
+        self._frames = ContextVar('applipy_inject_memory_frames', default=())
+        self._serial = _SerialLock()
+        self._async_owner = False
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # tracemalloc measures the memory of the whole process, so providers are
+    # run one at a time while they are tracked. Providers that are nested in a
+    # tracked provider run under the lock already held by their context.
+
+    @contextmanager
+    def track(self, key: Key, item: Any) -> Iterator[None]:
+        nested = bool(self._frames.get())
+        if not nested:
+            self._acquire()
+        try:
+            with self._measure(key, item):
+                yield
+        finally:
+            if not nested:
+                self._serial.release()
+
+    @asynccontextmanager
+    async def atrack(self, key: Key, item: Any) -> AsyncIterator[None]:
+        nested = bool(self._frames.get())
+        if not nested:
+            await self._serial.aacquire()
+            self._async_owner = True
+        try:
+            with self._measure(key, item):
+                yield
+        finally:
+            if not nested:
+                self._async_owner = False
+                self._serial.release()
+
+    # A tracked provider that waits for a singleton built by another thread or
+    # task gives the lock up while it waits, as the builder may need it to run
+    # its own tracked providers. What is allocated meanwhile is not attributed
+    # to the frames of the waiting provider.
+
+    @contextmanager
+    def waiting(self) -> Iterator[None]:
+        stack = self._frames.get()
+        if not stack:
+            yield
+            return
+        paused = tracemalloc.get_traced_memory()[0]
+        self._serial.release()
+        try:
+            yield
+        finally:
+            self._serial.acquire()
+            self._resume(stack, paused)
+
+    @asynccontextmanager
+    async def awaiting(self) -> AsyncIterator[None]:
+        stack = self._frames.get()
+        if not stack:
+            yield
+            return
+        paused = tracemalloc.get_traced_memory()[0]
+        async_owner = self._async_owner
+        self._async_owner = False
+        self._serial.release()
+        try:
+            yield
+        finally:
+            # The tracked provider releases the lock when it finishes, so it
+            # has to be taken back even if the task is cancelled meanwhile.
+            cancelled = False
+            while True:
+                try:
+                    await self._serial.aacquire()
+                    break
+                except asyncio.CancelledError:
+                    cancelled = True
+            self._async_owner = async_owner
+            self._resume(stack, paused)
+            if cancelled:
+                raise asyncio.CancelledError()
+
+    def _resume(self, stack: Tuple[_Frame, ...], paused: int) -> None:
+        elapsed = tracemalloc.get_traced_memory()[0] - paused
+        for frame in stack:
+            frame.start += elapsed
+
+    def _acquire(self) -> None:
+        if self._serial.try_acquire():
+            return
+        if self._async_owner and _in_event_loop():
+            # Waiting would block the event loop that has to finish the
+            # asynchronous provider holding the lock.
+            raise RuntimeError('Cannot instantiate a provider synchronously in an event loop while an asynchronous '
+                               'provider is being tracked, use `aget()` while memory tracking is enabled')
+        self._serial.acquire()
+
+    @contextmanager
+    def _measure(self, key: Key, item: Any) -> Iterator[None]:
+        stack = self._frames.get()
+        frame = _Frame(tracemalloc.get_traced_memory()[0])
+        token = self._frames.set(stack + (frame,))
+        try:
+            yield
+        finally:
+            self._frames.reset(token)
+            allocated = tracemalloc.get_traced_memory()[0] - frame.start
+            if stack:
+                stack[-1].nested += allocated
+            with self._lock:
+                usage = self._usages.get(key)
+                if usage is None:
+                    usage = self._usages[key] = MemoryUsage(key)
+                usage.instantiations += 1
+                usage.allocated += allocated - frame.nested
+                if item.is_singleton:
+                    self._singletons[key] = item
+
+    def report(self) -> List[MemoryUsage]:
+        with self._lock:
+            usages = list(self._usages.values())
+            singletons = dict(self._singletons)
+
+        instances = {key: item.instance for key, item in singletons.items() if item.instance is not None}
+        exclude = {id(instance) for instance in instances.values()}
+        for usage in usages:
+            if usage.key in instances:
+                usage.retained = retained_size(instances[usage.key], exclude)
+            else:
+                usage.retained = None
+
+        return sorted(usages, key=lambda u: -max(u.allocated, u.retained or 0))
@@ -0,0 +1,164 @@
+from contextlib import contextmanager
+from hashlib import sha1
+from tempfile import gettempdir
+from threading import get_ident
+from typing import Any, Callable, Iterator, Optional
+import mmap
+import os
+import struct
+import sys
+
+if sys.platform != 'win32':
+    import fcntl
+
+
+# Every payload starts with a header that identifies the file and the process
+# that published it. A payload whose process is gone is stale: it is removed
+# and built again.
+_HEADER = struct.Struct('!8sQ')
+_MAGIC = b'applipy\x01'
+_PREFIX = 'applipy_'
+
+
+def shared_directory() -> str:
+    if os.path.isdir('/dev/shm'):
+        return '/dev/shm'
+    return gettempdir()
+
+
+def shared_payload_path(name: Optional[str], type_name: str, namespace: Optional[str] = None) -> str:
+    if namespace is None:
+        namespace = str(os.getpgrp()) if hasattr(os, 'getpgrp') else ''
+    digest = sha1(f'{namespace}\0{name}\0{type_name}'.encode()).hexdigest()
+    return os.path.join(shared_directory(), f'{_PREFIX}{digest[:20]}')
+
+
+def _is_alive(pid: int) -> bool:
+    if pid == os.getpid() or sys.platform == 'win32':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_owner(fd: int) -> Optional[int]:
+    header = os.pread(fd, _HEADER.size, 0) if hasattr(os, 'pread') else os.read(fd, _HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    magic, owner = _HEADER.unpack(header)
+    return int(owner) if magic == _MAGIC else None
+
+
+def _attach(path: str, remove_stale: bool) -> Optional[mmap.mmap]:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        owner = _read_owner(fd)
+        if owner is None:
+            raise ValueError(f'`{path}` is not a shared payload')
+        if not _is_alive(owner):
+            if remove_stale:
+                _remove(path)
+            return None
+        return mmap.mmap(fd, os.fstat(fd).st_size, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+
+def _remove(path: str) -> None:
+    for stale in (path, f'{path}.lock'):
+        try:
+            os.unlink(stale)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_payloads(directory: str) -> None:
+    for entry in os.scandir(directory):
+        if not entry.name.startswith(_PREFIX) or entry.name.endswith('.lock'):
+            continue
+        try:
+            fd = os.open(entry.path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            owner = _read_owner(fd)
+        finally:
+            os.close(fd)
+        if owner is not None and not _is_alive(owner):
+            _remove(entry.path)
+
+
+@contextmanager
+def _build_lock(path: str) -> Iterator[None]:
+    # Only one process builds a payload at a time, the rest wait for it and
+    # attach to what it published. The lock is released by the system if the
+    # process dies while building.
+    if sys.platform == 'win32':
+        yield
+        return
+    fd = os.open(f'{path}.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _publish(path: str, build: Callable[[], Any]) -> bool:
+    # The payload is written to a temporary file that is then linked to its
+    # final path, so other processes never open a partially written payload.
+    payload = memoryview(build()).cast('B')
+    temporary = f'{path}.{os.getpid()}.{get_ident()}'
+    try:
+        with open(temporary, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, os.getpid()))
+            f.write(payload)
+        os.link(temporary, path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        payload.release()
+        os.unlink(temporary)
+
+
+@contextmanager
+def shared_payload(path: str, build: Callable[[], Any]) -> Iterator[memoryview]:
+    created = False
+    mapping = _attach(path, remove_stale=False)
+    if mapping is None:
+        with _build_lock(path):
+            mapping = _attach(path, remove_stale=True)
+            if mapping is None:
+                _remove_stale_payloads(os.path.dirname(path))
+                try:
+                    created = _publish(path, build)
+                except BaseException:
+                    _remove(path)
+                    raise
+                mapping = _attach(path, remove_stale=False)
+    if mapping is None:
+        raise FileNotFoundError(f'Shared payload `{path}` was removed while attaching to it')
+
+    mapped = memoryview(mapping)
+    view = mapped[_HEADER.size:]
+    try:
+        yield view
+    finally:
+        # If objects built from the payload still reference the mapping, it is
+        # released when they are garbage collected.
+        try:
+            view.release()
+            mapped.release()
+            mapping.close()
+        except BufferError:
+            pass
+        if created:
+            _remove(path)
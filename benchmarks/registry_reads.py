@@ -0,0 +1,104 @@
+"""
+Measures how reads of the injector registry scale with the number of threads.
+
+Every thread resolves a singleton and misses an optional binding in a loop
+while, optionally, another thread keeps binding new instances. On free-threaded
+builds of CPython the throughput should grow with the number of threads, as
+readers never take a lock.
+
+    python benchmarks/registry_reads.py --threads 1 2 4 8 --writer
+
+It also measures the throughput of configuring injectors with a growing number
+of bindings, which should stay about the same for any number of bindings:
+
+    python benchmarks/registry_reads.py --binds 2000 8000 16000
+"""
+import sys
+from argparse import ArgumentParser
+from os.path import abspath, dirname, join
+from threading import Barrier, Event, Thread
+from time import perf_counter
+from typing import List
+
+sys.path.insert(0, abspath(join(dirname(__file__), '..')))
+
+from applipy_inject import Injector  # noqa: E402
+
+
+class Service:
+    pass
+
+
+def run(threads: int, duration: float, writer: bool) -> float:
+    injector = Injector()
+    injector.bind(Service)
+    for i in range(1000):
+        injector.bind(int, i, name=str(i))
+
+    barrier = Barrier(threads + 1)
+    stop = Event()
+    counts: List[int] = [0] * threads
+
+    def read(index: int) -> None:
+        count = 0
+        barrier.wait()
+        while not stop.is_set():
+            for _ in range(100):
+                injector.get(Service)
+                injector.get_optional(str, name='missing')
+            count += 100
+        counts[index] = count
+
+    def write() -> None:
+        i = 0
+        while not stop.is_set():
+            injector.bind(float, float(i), name=str(i % 1000))
+            i += 1
+
+    workers = [Thread(target=read, args=(i,)) for i in range(threads)]
+    if writer:
+        workers.append(Thread(target=write))
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    start = perf_counter()
+    stop.wait(duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    elapsed = perf_counter() - start
+
+    return sum(counts) / elapsed
+
+
+def bind(count: int) -> float:
+    injector = Injector()
+    start = perf_counter()
+    for i in range(count):
+        injector.bind(int, i, name=str(i))
+    return count / (perf_counter() - start)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='*', default=[1, 2, 4, 8])
+    parser.add_argument('--duration', type=float, default=2.0)
+    parser.add_argument('--writer', action='store_true', help='bind new instances while reading')
+    parser.add_argument('--binds', type=int, nargs='+', default=[],
+                        help='measure the bind throughput of injectors with these numbers of bindings')
+    args = parser.parse_args()
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'python {sys.version.split()[0]}, GIL {"enabled" if gil else "disabled"}')
+    baseline = None
+    for threads in args.threads:
+        throughput = run(threads, args.duration, args.writer)
+        baseline = baseline or throughput
+        print(f'{threads:>3} threads: {throughput:>12,.0f} reads/s ({throughput / baseline:.2f}x)')
+    for count in args.binds:
+        print(f'{count:>8} bindings: {bind(count):>12,.0f} binds/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Load test of a single injector shared by many threads and asyncio tasks.
+
+Every worker runs a random mix of operations against the same injector:
+singleton hits, non-singleton construction, List[T] multibindings, optional
+misses and bindings added at runtime. At the end it reports the throughput and
+latency percentiles of each operation and checks that:
+ - every singleton was constructed exactly once,
+ - no operation raised an exception,
+ - no operation returned an unexpected value.
+
+    python benchmarks/stress.py --threads 8 --tasks 64 --duration 10
+"""
+import asyncio
+import sys
+from argparse import ArgumentParser
+from collections import Counter
+from os.path import abspath, dirname, join
+from random import Random
+from threading import Barrier, Event, Lock, Thread
+from time import perf_counter, sleep
+from typing import Callable, List, Optional, Tuple
+
+sys.path.insert(0, abspath(join(dirname(__file__), '..')))
+
+from applipy_inject import Injector  # noqa: E402
+
+
+SINGLETONS = 20
+PLUGINS = 5
+
+
+class Constructions:
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.counts: Counter[str] = Counter()
+
+    def add(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] += 1
+
+
+def make_singleton(index: int, constructions: Constructions) -> Callable[[], str]:
+    def provide() -> str:
+        constructions.add(f'singleton-{index}')
+        sleep(0.001)
+        return f'singleton-{index}'
+
+    return provide
+
+
+class Session:
+
+    def __init__(self, config: dict) -> None:  # type: ignore[type-arg]
+        self.config = config
+
+
+class Plugin:
+    pass
+
+
+class Handler:
+
+    def __init__(self, session: Session, plugins: List[Plugin], extra: Optional[bytes]) -> None:
+        self.session = session
+        self.plugins = plugins
+        self.extra = extra
+
+
+def build_injector(constructions: Constructions) -> Injector:
+    injector = Injector()
+    injector.bind(dict, {'url': 'db://'})
+    for i in range(SINGLETONS):
+        injector.bind(str, make_singleton(i, constructions), name=f'singleton-{i}')
+    for _ in range(PLUGINS):
+        injector.bind(Plugin, Plugin())
+    injector.bind(Session, singleton=False)
+    injector.bind(Handler, singleton=False)
+    return injector
+
+
+class Results:
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.latencies: dict[str, List[float]] = {}
+        self.errors: List[Tuple[str, BaseException]] = []
+        self.bound = 0
+
+    def merge(self, latencies: dict[str, List[float]], errors: List[Tuple[str, BaseException]]) -> None:
+        with self.lock:
+            for operation, values in latencies.items():
+                self.latencies.setdefault(operation, []).extend(values)
+            self.errors.extend(errors)
+
+
+class Workload:
+
+    operations = ('singleton', 'transient', 'collection', 'optional_miss', 'bind')
+    weights = (50, 25, 15, 9, 1)
+
+    def __init__(self, injector: Injector, results: Results, seed: int) -> None:
+        self.injector = injector
+        self.results = results
+        self.random = Random(seed)
+        self.latencies: dict[str, List[float]] = {operation: [] for operation in self.operations}
+        self.errors: List[Tuple[str, BaseException]] = []
+
+    def choose(self) -> str:
+        return self.random.choices(self.operations, self.weights)[0]
+
+    def check(self, operation: str, value: object) -> None:
+        if operation == 'singleton':
+            assert isinstance(value, str) and value.startswith('singleton-'), value
+        elif operation == 'transient':
+            assert isinstance(value, Handler) and value.session.config == {'url': 'db://'}, value
+        elif operation == 'collection':
+            assert isinstance(value, list) and len(value) >= PLUGINS, value
+        elif operation == 'optional_miss':
+            assert value is None, value
+
+    def run(self, operation: str) -> object:
+        injector = self.injector
+        if operation == 'singleton':
+            return injector.get(str, name=f'singleton-{self.random.randrange(SINGLETONS)}')
+        elif operation == 'transient':
+            return injector.get(Handler)
+        elif operation == 'collection':
+            return injector.get_all(Plugin)
+        elif operation == 'optional_miss':
+            return injector.get_optional(float, name='missing')
+        else:
+            injector.bind(Plugin, Plugin())
+            with self.results.lock:
+                self.results.bound += 1
+            return None
+
+    async def arun(self, operation: str) -> object:
+        injector = self.injector
+        if operation == 'singleton':
+            return await injector.aget(str, name=f'singleton-{self.random.randrange(SINGLETONS)}')
+        elif operation == 'transient':
+            return await injector.aget(Handler)
+        elif operation == 'collection':
+            return await injector.aget_all(Plugin)
+        elif operation == 'optional_miss':
+            return await injector.aget_optional(float, name='missing')
+        else:
+            return self.run(operation)
+
+    def record(self, operation: str, start: float, value: object) -> None:
+        self.latencies[operation].append(perf_counter() - start)
+        try:
+            self.check(operation, value)
+        except AssertionError as e:
+            self.errors.append((operation, e))
+
+    def thread_loop(self, start: Barrier, stop: Event) -> None:
+        start.wait()
+        while not stop.is_set():
+            operation = self.choose()
+            begin = perf_counter()
+            try:
+                value = self.run(operation)
+            except Exception as e:
+                self.errors.append((operation, e))
+                continue
+            self.record(operation, begin, value)
+        self.results.merge(self.latencies, self.errors)
+
+    async def task_loop(self, stop: Event) -> None:
+        while not stop.is_set():
+            operation = self.choose()
+            begin = perf_counter()
+            try:
+                value = await self.arun(operation)
+            except Exception as e:
+                self.errors.append((operation, e))
+                continue
+            self.record(operation, begin, value)
+            await asyncio.sleep(0)
+        self.results.merge(self.latencies, self.errors)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main() -> int:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--tasks', type=int, default=64, help='asyncio tasks, run in their own event loop thread')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    constructions = Constructions()
+    injector = build_injector(constructions)
+    results = Results()
+    start = Barrier(args.threads + 2)
+    stop = Event()
+
+    workers = [Thread(target=Workload(injector, results, args.seed + i).thread_loop, args=(start, stop))
+               for i in range(args.threads)]
+
+    def event_loop() -> None:
+        async def run_tasks() -> None:
+            start.wait()
+            await asyncio.gather(*(Workload(injector, results, args.seed + args.threads + i).task_loop(stop)
+                                   for i in range(args.tasks)))
+
+        asyncio.run(run_tasks())
+
+    workers.append(Thread(target=event_loop))
+    for worker in workers:
+        worker.start()
+
+    start.wait()
+    begin = perf_counter()
+    stop.wait(args.duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    elapsed = perf_counter() - begin
+
+    total = sum(len(values) for values in results.latencies.values())
+    print(f'{args.threads} threads, {args.tasks} asyncio tasks, {elapsed:.1f}s')
+    print(f'throughput: {total / elapsed:,.0f} operations/s')
+    print(f'{"operation":<15} {"count":>10} {"p50 (us)":>10} {"p99 (us)":>10}')
+    for operation, values in sorted(results.latencies.items()):
+        if not values:
+            continue
+        values.sort()
+        print(f'{operation:<15} {len(values):>10} '
+              f'{percentile(values, 0.5) * 1e6:>10.1f} {percentile(values, 0.99) * 1e6:>10.1f}')
+
+    failures: List[str] = []
+    constructed_once = all(constructions.counts[f'singleton-{i}'] <= 1 for i in range(SINGLETONS))
+    if not constructed_once:
+        failures.append(f'singletons constructed more than once: {dict(constructions.counts)}')
+    plugins = len(injector.get_all(Plugin))
+    if plugins != PLUGINS + results.bound:
+        failures.append(f'expected {PLUGINS + results.bound} plugins, found {plugins}')
+    for operation, error in results.errors[:10]:
+        failures.append(f'{operation}: {type(error).__name__}: {error}')
+    if len(results.errors) > 10:
+        failures.append(f'... {len(results.errors) - 10} more errors')
+
+    print()
+    print('checks: ' + ('FAILED' if failures else 'OK'))
+    for failure in failures:
+        print(f'  {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import json
+from typing import Annotated, Iterator, List, Optional
+
+import pytest
+
+from applipy_inject import Injector, name
+from applipy_inject.__main__ import main
+from applipy_inject.analysis import analyze, format_key, load_injector, time_providers
+
+
+class Config:
+    pass
+
+
+class Session:
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+
+
+class Repository:
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+
+class Service:
+
+    def __init__(self, repository: Repository, session: Session, missing: bytes) -> None:
+        ...
+
+
+class Handler:
+
+    def __init__(self, service: Service, repository: Repository, maybe: Optional[float]) -> None:
+        ...
+
+
+def build_injector() -> Injector:
+    injector = Injector()
+    injector.bind(Config, Config())
+    injector.bind(Session, singleton=False)
+    injector.bind(Repository, singleton=False)
+    injector.bind(Service)
+    injector.bind(Handler)
+    return injector
+
+
+def build_cyclic_injector() -> Injector:
+    injector = build_injector()
+
+    def provide_int(s: str) -> int:
+        return int(s)
+
+    def provide_str(i: int) -> str:
+        return str(i)
+
+    injector.bind(provide_int)
+    injector.bind(provide_str)
+    injector.bind(str, 'x', name='other')
+    injector.bind(str, 'y', name='other')
+
+    def provide_list(ints: List[int],
+                     s: str,
+                     other: Annotated[Optional[str], name('other')]) -> list:  # type: ignore[type-arg]
+        return [ints, s, other]
+
+    injector.bind(provide_list)
+
+    return injector
+
+
+def test_analyze() -> None:
+    report = analyze(build_injector())
+
+    assert [(b.key, b.dependency) for b in report.missing] == [((None, Service), (None, bytes))]
+    assert report.ambiguous == []
+    assert report.cycles == []
+    assert [(f.key, f.dependents, f.is_singleton) for f in report.fan_in] == [
+        ((None, Session), 2, False),
+        ((None, Repository), 2, False),
+        ((None, Config), 1, True),
+        ((None, Service), 1, True),
+    ]
+    assert report.longest_chains[0] == [(None, Handler), (None, Service), (None, Repository),
+                                        (None, Session), (None, Config)]
+    assert [(t.key, t.paths) for t in report.transient_paths] == [((None, Session), 3), ((None, Repository), 2)]
+    assert report.has_errors
+
+
+def test_analyze_cycles_and_ambiguous() -> None:
+    report = analyze(build_cyclic_injector())
+
+    assert report.cycles == [[(None, int), (None, str), (None, int)]]
+    assert [(b.key, b.dependency) for b in report.ambiguous] == [((None, list), ('other', str))]
+
+
+def test_time_providers() -> None:
+    injector = Injector()
+
+    def provide_int() -> Iterator[int]:
+        yield 1
+
+    def provide_str(i: int, b: bytes) -> str:
+        return str(i)
+
+    injector.bind(provide_int)
+    injector.bind(provide_str)
+    injector.bind(float, 1.0)
+
+    timings = {t.key: t for t in time_providers(injector)}
+
+    assert set(timings) == {(None, int), (None, str)}
+    assert timings[None, int].seconds is not None
+    assert timings[None, str].seconds is None
+    assert timings[None, str].error is not None
+
+
+def test_load_injector() -> None:
+    assert isinstance(load_injector('tests.test_analysis:build_injector'), Injector)
+
+    with pytest.raises(ValueError):
+        load_injector('tests.test_analysis')
+
+    with pytest.raises(TypeError):
+        load_injector('tests.test_analysis:Config')
+
+
+def test_format_key() -> None:
+    assert format_key((None, int)) == 'int'
+    assert format_key(('foo', Config)) == 'tests.test_analysis.Config (name=foo)'
+
+
+def test_main_json(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(['inspect', 'tests.test_analysis:build_injector', '--json', '--time']) == 1
+
+    report = json.loads(capsys.readouterr().out)
+
+    assert report['missing'] == [{
+        'key': 'tests.test_analysis.Service',
+        'dependency': 'bytes',
+        'providers': ['Service'],
+    }]
+    assert len(report['timings']) == 4
+
+
+def test_main_text(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(['inspect', 'tests.test_analysis:build_cyclic_injector']) == 1
+
+    output = capsys.readouterr().out
+
+    assert 'Dependency cycles (1)\n  int -> str -> int\n' in output
+
+
+closed_sessions: List[Session] = []
+
+
+def build_injector_with_cleanup() -> Injector:
+    injector = Injector()
+
+    def provide_session(config: Config) -> Iterator[Session]:
+        session = Session(config)
+        yield session
+        closed_sessions.append(session)
+
+    injector.bind(Config, Config())
+    injector.bind(provide_session)
+    injector.bind(Repository)
+    return injector
+
+
+def test_main_time_cleans_up(capsys: pytest.CaptureFixture[str]) -> None:
+    closed_sessions.clear()
+
+    assert main(['inspect', 'tests.test_analysis:build_injector_with_cleanup', '--time']) == 0
+
+    # the session that was timed and the one that was injected into Repository
+    assert len(closed_sessions) == 2
@@ -0,0 +1,107 @@
+from typing import Generic, Iterator, List, TypeVar
+
+from applipy_inject import Injector
+
+
+T = TypeVar('T')
+
+
+class A:
+    pass
+
+
+class B:
+
+    def __init__(self, a: A) -> None:
+        self.a = a
+
+
+class Repository(Generic[T]):
+    pass
+
+
+def test_clone_is_independent() -> None:
+    injector = Injector()
+    injector.bind(A)
+    injector.bind(B)
+    a = injector.get(A)
+
+    clone = injector.clone()
+    clone.bind(str, 'clone')
+
+    assert clone.get(A) is not a
+    assert clone.get(B).a is clone.get(A)
+    assert injector.get(B).a is a
+    assert clone.get(str) == 'clone'
+    assert injector.get_optional(str) is None
+
+
+def test_clone_shares_providers() -> None:
+    injector = Injector()
+    injector.bind((A, object), A)
+
+    clone = injector.clone()
+
+    (item,) = injector.providers[None, A]
+    (copied,) = clone.providers[None, A]
+    assert copied is not item
+    assert copied.provider is item.provider
+    assert clone.providers[None, object] == (copied,)
+
+
+def test_clone_keeps_bound_instances() -> None:
+    injector = Injector()
+    a = A()
+    injector.bind(A, a)
+
+    assert injector.clone().get(A) is a
+
+
+def test_snapshot_includes_singletons() -> None:
+    injector = Injector()
+    injector.bind(A)
+    injector.bind(B, singleton=False)
+    a = injector.get(A)
+
+    snapshot = injector.snapshot()
+
+    assert snapshot.get(A) is a
+    assert snapshot.get(B) is not injector.get(B)
+
+
+def test_snapshot_does_not_share_singletons_with_cleanup() -> None:
+    injector = Injector()
+    closed: List[A] = []
+
+    def provide_a() -> Iterator[A]:
+        a = A()
+        yield a
+        closed.append(a)
+
+    injector.bind(provide_a)
+    injector.bind(B)
+    b = injector.get(B)
+
+    snapshot = injector.snapshot()
+
+    snapshot_b = snapshot.get(B)
+    assert snapshot_b is not b
+    assert snapshot_b.a is not b.a
+
+    injector.close()
+    assert closed == [b.a]
+
+    snapshot.close()
+    assert closed == [b.a, snapshot_b.a]
+
+
+def test_clone_generic_bindings() -> None:
+    injector = Injector()
+    injector.bind(Repository[T], Repository)  # type: ignore[valid-type]
+    repository = injector.get(Repository[int])
+
+    clone = injector.clone()
+
+    assert clone.get(Repository[int]) is not repository
+    assert isinstance(clone.get(Repository[str]), Repository)
+    assert injector.snapshot().get(Repository[int]) is repository
@@ -0,0 +1,188 @@
+import asyncio
+from threading import Barrier, Event, Thread
+from time import sleep
+from typing import List
+
+import pytest
+
+from applipy_inject import Injector
+
+
+def test_bind_while_getting_all() -> None:
+    injector = Injector()
+    errors: List[BaseException] = []
+
+    injector.bind(int, 0)
+
+    def read() -> None:
+        try:
+            for _ in range(2000):
+                injector.get_all(int)
+                injector.get_optional(str, name='missing')
+        except BaseException as e:
+            errors.append(e)
+
+    def write() -> None:
+        try:
+            for i in range(2000):
+                injector.bind(int, i)
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [Thread(target=read) for _ in range(4)] + [Thread(target=write)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(injector.get_all(int)) == 2001
+    assert (None, str) not in injector.providers
+    assert ('missing', str) not in injector.providers
+
+
+def test_singleton_constructed_once() -> None:
+    injector = Injector()
+    barrier = Barrier(8)
+    constructed: List[object] = []
+
+    class Slow:
+        def __init__(self) -> None:
+            constructed.append(self)
+            sleep(0.01)
+
+    injector.bind(Slow)
+
+    results: List[Slow] = []
+
+    def get() -> None:
+        barrier.wait()
+        results.append(injector.get(Slow))
+
+    threads = [Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(constructed) == 1
+    assert all(r is constructed[0] for r in results)
+
+
+def test_singleton_constructed_once_from_threads_and_tasks() -> None:
+    injector = Injector()
+    barrier = Barrier(5)
+    constructed: List[object] = []
+
+    class Slow:
+        def __init__(self) -> None:
+            constructed.append(self)
+            sleep(0.01)
+
+    injector.bind(Slow)
+
+    results: List[Slow] = []
+
+    def get() -> None:
+        barrier.wait()
+        results.append(injector.get(Slow))
+
+    def aget() -> None:
+        async def run() -> List[Slow]:
+            barrier.wait()
+            return await asyncio.gather(*(injector.aget(Slow) for _ in range(4)))
+
+        results.extend(asyncio.run(run()))
+
+    threads = [Thread(target=get) for _ in range(4)] + [Thread(target=aget)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(constructed) == 1
+    assert len(results) == 8
+    assert all(r is constructed[0] for r in results)
+
+
+def test_singleton_failure_is_raised_to_waiters_and_retried() -> None:
+    injector = Injector()
+    barrier = Barrier(4)
+    attempts: List[int] = []
+
+    def provide_int() -> int:
+        attempts.append(1)
+        sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError('first attempt')
+        return len(attempts)
+
+    injector.bind(provide_int)
+
+    errors: List[BaseException] = []
+
+    def get() -> None:
+        barrier.wait()
+        try:
+            injector.get(int)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [Thread(target=get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) >= 1
+    assert injector.get(int) == len(attempts)
+
+
+def test_bind_many_keys_while_getting() -> None:
+    injector = Injector()
+    errors: List[BaseException] = []
+    done = Event()
+
+    def read() -> None:
+        try:
+            while not done.is_set():
+                for i in range(0, 1000, 37):
+                    value = injector.get_optional(int, name=str(i))
+                    assert value is None or value == i
+        except BaseException as e:
+            errors.append(e)
+
+    readers = [Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(1000):
+        injector.bind(int, i, name=str(i))
+    done.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert all(injector.get(int, name=str(i)) == i for i in range(1000))
+    assert len(injector.providers) == 1000
+
+
+def test_get_while_building_asynchronously_on_the_same_loop() -> None:
+    injector = Injector()
+
+    class Conn:
+        pass
+
+    async def provide_conn() -> Conn:
+        await asyncio.sleep(0.01)
+        return Conn()
+
+    injector.bind(provide_conn)
+
+    async def run() -> None:
+        task = asyncio.create_task(injector.aget(Conn))
+        await asyncio.sleep(0)
+        with pytest.raises(TypeError, match='being built asynchronously'):
+            injector.get(Conn)
+        assert await injector.aget(Conn) is await task
+
+    asyncio.run(run())
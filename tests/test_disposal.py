@@ -0,0 +1,304 @@
+import asyncio
+from threading import Event
+from typing import AsyncIterator, Iterator, List
+
+import pytest
+
+from applipy_inject import Injector, with_names
+
+
+class Pool:
+    pass
+
+
+class Client:
+
+    def __init__(self, pool: Pool) -> None:
+        self.pool = pool
+
+
+class Service:
+
+    def __init__(self, client: Client, pool: Pool) -> None:
+        self.client = client
+        self.pool = pool
+
+
+def test_generator_provider() -> None:
+    injector = Injector()
+    events: List[str] = []
+
+    def provide_pool() -> Iterator[Pool]:
+        events.append('open')
+        yield Pool()
+        events.append('close')
+
+    injector.bind(provide_pool)
+
+    pool = injector.get(Pool)
+
+    assert isinstance(pool, Pool)
+    assert injector.get(Pool) is pool
+    assert events == ['open']
+
+    injector.close()
+
+    assert events == ['open', 'close']
+    assert injector.get(Pool) is not pool
+
+
+def test_close_in_reverse_dependency_order() -> None:
+    injector = Injector()
+    events: List[str] = []
+
+    def provide_pool() -> Iterator[Pool]:
+        yield Pool()
+        events.append('pool')
+
+    def provide_client(pool: Pool) -> Iterator[Client]:
+        yield Client(pool)
+        events.append('client')
+
+    injector.bind(provide_pool)
+    injector.bind(provide_client)
+    injector.bind(Service)
+
+    service = injector.get(Service)
+    injector.close()
+
+    assert events == ['client', 'pool']
+    assert injector.get(Service) is not service
+
+
+def test_close_independent_branches_concurrently() -> None:
+    injector = Injector()
+    a_closing = Event()
+    b_closing = Event()
+
+    def provide_a() -> Iterator[int]:
+        yield 1
+        a_closing.set()
+        assert b_closing.wait(5)
+
+    def provide_b() -> Iterator[str]:
+        yield 'b'
+        b_closing.set()
+        assert a_closing.wait(5)
+
+    injector.bind(provide_a)
+    injector.bind(provide_b)
+
+    injector.get(int)
+    injector.get(str)
+    injector.close()
+
+    assert a_closing.is_set() and b_closing.is_set()
+
+
+def test_close_not_singleton() -> None:
+    injector = Injector()
+    closed: List[Pool] = []
+
+    def provide_pool() -> Iterator[Pool]:
+        pool = Pool()
+        yield pool
+        closed.append(pool)
+
+    injector.bind(provide_pool, singleton=False)
+
+    pools = [injector.get(Pool), injector.get(Pool)]
+    injector.close()
+
+    assert closed == pools or closed == pools[::-1]
+
+
+def test_close_reports_errors_after_closing_everything() -> None:
+    injector = Injector()
+    events: List[str] = []
+
+    def provide_pool() -> Iterator[Pool]:
+        yield Pool()
+        events.append('pool')
+
+    def provide_client(pool: Pool) -> Iterator[Client]:
+        yield Client(pool)
+        raise ValueError('client')
+
+    injector.bind(provide_pool)
+    injector.bind(provide_client)
+
+    injector.get(Client)
+
+    with pytest.raises(ValueError):
+        injector.close()
+    assert events == ['pool']
+
+
+def test_with_names_generator_provider() -> None:
+    injector = Injector()
+    events: List[str] = []
+
+    def provide_pool(value: int) -> Iterator[Pool]:
+        yield Pool()
+        events.append(f'close {value}')
+
+    injector.bind(int, 3, name='size')
+    injector.bind(with_names(provide_pool, 'size'))
+
+    injector.get(Pool)
+    injector.close()
+
+    assert events == ['close 3']
+
+
+def test_async_providers() -> None:
+    injector = Injector()
+    events: List[str] = []
+
+    async def provide_pool() -> AsyncIterator[Pool]:
+        yield Pool()
+        await asyncio.sleep(0)
+        events.append('pool')
+
+    async def provide_client(pool: Pool) -> Client:
+        return Client(pool)
+
+    def provide_service(client: Client, pool: Pool) -> Iterator[Service]:
+        yield Service(client, pool)
+        events.append('service')
+
+    injector.bind(provide_pool)
+    injector.bind(provide_client)
+    injector.bind(provide_service)
+
+    async def run() -> Service:
+        service = await injector.aget(Service)
+        assert await injector.aget(Service) is service
+        with pytest.raises(RuntimeError):
+            injector.close()
+        await injector.aclose()
+        return service
+
+    service = asyncio.run(run())
+
+    assert service.client.pool is service.pool
+    assert events == ['service', 'pool']
+
+
+def test_async_provider_with_get() -> None:
+    injector = Injector()
+
+    async def provide_pool() -> Pool:
+        return Pool()
+
+    injector.bind(provide_pool)
+
+    with pytest.raises(TypeError):
+        injector.get(Pool)
+
+    pool = asyncio.run(injector.aget(Pool))
+
+    assert injector.get(Pool) is pool
+
+
+def test_async_singleton_constructed_once() -> None:
+    injector = Injector()
+    constructed: List[Pool] = []
+
+    async def provide_pool() -> Pool:
+        await asyncio.sleep(0.01)
+        constructed.append(Pool())
+        return constructed[-1]
+
+    injector.bind(provide_pool)
+
+    async def run() -> List[Pool]:
+        return await asyncio.gather(*(injector.aget(Pool) for _ in range(5)))
+
+    pools = asyncio.run(run())
+
+    assert len(constructed) == 1
+    assert all(pool is constructed[0] for pool in pools)
+
+
+def test_scope_closes_its_instances() -> None:
+    injector = Injector()
+    closed: List[object] = []
+
+    def provide_pool() -> Iterator[Pool]:
+        pool = Pool()
+        yield pool
+        closed.append(pool)
+
+    def provide_client(pool: Pool) -> Iterator[Client]:
+        client = Client(pool)
+        yield client
+        closed.append(client)
+
+    injector.bind(provide_pool)
+    injector.bind(provide_client, singleton=False)
+
+    with injector.scope():
+        first = injector.get(Client)
+        second = injector.get(Client)
+
+    assert closed == [first, second] or closed == [second, first]
+
+    with injector.scope():
+        third = injector.get(Client)
+    injector.close()
+
+    assert closed[2:] == [third, third.pool]
+
+
+def test_scope_does_not_own_singletons() -> None:
+    injector = Injector()
+    closed: List[object] = []
+
+    class Session:
+        pass
+
+    def provide_session() -> Iterator[Session]:
+        session = Session()
+        yield session
+        closed.append(session)
+
+    class Repository:
+
+        def __init__(self, session: Session) -> None:
+            self.session = session
+
+    injector.bind(provide_session, singleton=False)
+    injector.bind(Repository)
+
+    with injector.scope():
+        repository = injector.get(Repository)
+        session = injector.get(Session)
+
+    assert closed == [session]
+
+    injector.close()
+
+    assert closed == [session, repository.session]
+
+
+def test_async_scope() -> None:
+    injector = Injector()
+    closed: List[Pool] = []
+
+    async def provide_pool() -> AsyncIterator[Pool]:
+        pool = Pool()
+        yield pool
+        closed.append(pool)
+
+    injector.bind(provide_pool, singleton=False)
+
+    async def run() -> List[Pool]:
+        async with injector.scope():
+            pools = await asyncio.gather(injector.aget(Pool), injector.aget(Pool))
+            assert closed == []
+        return list(pools)
+
+    pools = asyncio.run(run())
+
+    assert sorted(map(id, closed)) == sorted(map(id, pools))
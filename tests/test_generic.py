@@ -0,0 +1,169 @@
+from typing import Generic, List, Optional, Type, TypeVar
+
+import pytest
+
+from applipy_inject import Injector
+from applipy_inject.analysis import analyze
+
+
+T = TypeVar('T')
+K = TypeVar('K')
+
+
+class Session:
+    pass
+
+
+class User:
+    pass
+
+
+class Order:
+    pass
+
+
+class Mapper(Generic[T]):
+
+    def __init__(self, model: Type[T]) -> None:
+        self.model = model
+
+
+class Repository(Generic[T]):
+
+    def __init__(self, session: Session, mapper: Mapper[T]) -> None:
+        self.session = session
+        self.mapper = mapper
+
+
+class Index(Generic[K, T]):
+    pass
+
+
+def test_generic_template_provider() -> None:
+    injector = Injector()
+    calls: List[type] = []
+
+    def make_repo(session: Session, model: Type[T], mapper: Mapper[T]) -> Repository[T]:
+        calls.append(model)
+        return Repository(session, mapper)
+
+    injector.bind(Session)
+    injector.bind(Mapper[T], Mapper)  # type: ignore[valid-type]
+    injector.bind(make_repo)
+
+    users = injector.get(Repository[User])
+    orders = injector.get(Repository[Order])
+
+    assert calls == [User, Order]
+    assert users.mapper.model is User
+    assert orders.mapper.model is Order
+    assert users.session is orders.session
+    assert injector.get(Repository[User]) is users
+
+
+def test_generic_template_class() -> None:
+    injector = Injector()
+
+    injector.bind(Session)
+    injector.bind(Mapper[T], Mapper, singleton=False)  # type: ignore[valid-type]
+    injector.bind(Repository[T], Repository)  # type: ignore[valid-type]
+
+    repository = injector.get(Repository[User])
+
+    assert repository.mapper.model is User
+    assert injector.get(Mapper[User]) is not repository.mapper
+
+
+def test_generic_template_class_without_provider() -> None:
+    injector = Injector()
+
+    injector.bind(Session)
+    injector.bind(Mapper[T], singleton=False)  # type: ignore[valid-type]
+    injector.bind(Repository[T])  # type: ignore[valid-type]
+
+    repository = injector.get(Repository[User])
+
+    assert isinstance(repository, Repository)
+    assert repository.mapper.model is User
+    assert injector.get(Repository[User]) is repository
+    assert injector.get(Mapper[Order]).model is Order
+
+
+def test_generic_exact_binding_takes_precedence() -> None:
+    injector = Injector()
+
+    injector.bind(Mapper[T], Mapper)  # type: ignore[valid-type]
+    mapper = Mapper(User)
+    injector.bind(Mapper[User], mapper)
+
+    assert injector.get(Mapper[User]) is mapper
+    assert injector.get(Mapper[Order]).model is Order
+
+
+def test_generic_template_with_name() -> None:
+    injector = Injector()
+
+    injector.bind(Mapper[T], Mapper, name='mapper')  # type: ignore[valid-type]
+
+    assert injector.get(Mapper[User], name='mapper').model is User
+    assert injector.get_optional(Mapper[User]) is None
+
+
+def test_generic_template_multiple_parameters() -> None:
+    injector = Injector()
+
+    def make_index(key: Type[K], value: Type[T]) -> Index[K, T]:
+        index = Index[K, T]()
+        setattr(index, 'types', (key, value))
+        return index
+
+    injector.bind(make_index)
+
+    assert getattr(injector.get(Index[str, User]), 'types') == (str, User)
+
+
+def test_generic_template_collections() -> None:
+    injector = Injector()
+
+    def make_mapper(model: Type[T]) -> Mapper[T]:
+        return Mapper(model)
+
+    def other_mapper(model: Type[T]) -> Mapper[T]:
+        return Mapper(model)
+
+    injector.bind(make_mapper)
+    injector.get(Mapper[User])
+    injector.bind(other_mapper)
+
+    def use(mappers: List[Mapper[T]], maybe: Optional[Mapper[T]]) -> Repository[T]:
+        return Repository(Session(), mappers[0])
+
+    injector.bind(use)
+
+    assert len(injector.get_all(Mapper[User])) == 2
+    assert len(injector.get_all(Mapper[Order])) == 2
+    assert injector.get(Repository[User]).mapper.model is User
+
+
+def test_generic_template_instance() -> None:
+    injector = Injector()
+
+    with pytest.raises(TypeError):
+        injector.bind_instance(Mapper[T], Mapper(User))  # type: ignore[valid-type]
+
+
+def test_generic_template_analysis() -> None:
+    injector = Injector()
+
+    class Service:
+        def __init__(self, users: Repository[User], orders: Repository[Order]) -> None:
+            ...
+
+    injector.bind(Mapper[T], Mapper)  # type: ignore[valid-type]
+    injector.bind(Repository[T], Repository)  # type: ignore[valid-type]
+    injector.bind(Service)
+
+    report = analyze(injector)
+
+    assert sorted(b.dependency[1].__name__ for b in report.missing) == ['Session', 'Session']
+    assert len(report.longest_chains[0]) == 3
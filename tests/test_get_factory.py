@@ -0,0 +1,216 @@
+from typing import List, Optional
+
+import pytest
+
+from applipy_inject import Injector
+
+
+class Service:
+    pass
+
+
+class Handler:
+
+    def __init__(self, service: Service, payload: str, count: int) -> None:
+        self.service = service
+        self.payload = payload
+        self.count = count
+
+
+def test_get_factory_assisted_arguments() -> None:
+    injector = Injector()
+
+    injector.bind(Service)
+    injector.bind(Handler, singleton=False)
+
+    factory = injector.get_factory(Handler, arguments=('payload', 'count'))
+    a = factory('a', count=1)
+    b = factory(payload='b', count=2)
+
+    assert a is not b
+    assert (a.payload, a.count) == ('a', 1)
+    assert (b.payload, b.count) == ('b', 2)
+    assert a.service is b.service
+    assert a.service is injector.get(Service)
+
+
+def test_get_factory_transient_dependencies_built_per_call() -> None:
+    injector = Injector()
+
+    class Session:
+        pass
+
+    sessions: List[Session] = []
+
+    def provide_handler(session: Session, payload: str) -> Handler:
+        sessions.append(session)
+        return Handler(Service(), payload, len(sessions))
+
+    injector.bind(Session, singleton=False)
+    injector.bind(provide_handler, singleton=False)
+
+    factory = injector.get_factory(Handler, arguments=('payload',))
+
+    factory('a')
+    factory('b')
+
+    assert len(sessions) == 2
+    assert sessions[0] is not sessions[1]
+
+
+def test_get_factory_collection_and_optional_dependencies() -> None:
+    injector = Injector()
+
+    def provide_str(ints: List[int], maybe: Optional[float], suffix: bytes) -> str:
+        return ','.join(str(i) for i in sorted(ints)) + f'|{maybe}|{suffix.decode()}'
+
+    injector.bind(int, 1)
+    injector.bind(int, 2)
+    injector.bind(provide_str)
+
+    factory = injector.get_factory(str, arguments=('suffix',))
+
+    assert factory(b'x') == '1,2|None|x'
+
+
+def test_get_factory_does_not_cache_singletons() -> None:
+    injector = Injector()
+
+    injector.bind(Service)
+    injector.bind(Handler)
+
+    factory = injector.get_factory(Handler, arguments=('payload', 'count'))
+
+    assert factory('a', 1) is not factory('a', 1)
+
+
+def test_get_factory_missing_binding() -> None:
+    injector = Injector()
+
+    with pytest.raises(ValueError):
+        injector.get_factory(Handler)
+
+
+def test_get_factory_arguments_are_explicit() -> None:
+    injector = Injector()
+
+    injector.bind(Service)
+    injector.bind(str, 'config')
+    injector.bind(int, 0)
+    injector.bind(Handler)
+
+    factory = injector.get_factory(Handler, arguments=('payload',))
+    handler = factory('body')
+
+    assert (handler.payload, handler.count) == ('body', 0)
+    assert injector.get_factory(Handler)().payload == 'config'
+
+
+def test_get_factory_unknown_argument() -> None:
+    injector = Injector()
+
+    injector.bind(Service)
+    injector.bind(Handler)
+
+    with pytest.raises(TypeError, match='no argument `size`'):
+        injector.get_factory(Handler, arguments=('payload', 'size'))
+
+
+def test_get_factory_missing_dependency_is_not_an_argument() -> None:
+    injector = Injector()
+
+    injector.bind(Service)
+    injector.bind(Handler)
+
+    with pytest.raises(ValueError):
+        injector.get_factory(Handler, arguments=('payload',))
+
+
+def test_get_factory_too_many_arguments() -> None:
+    injector = Injector()
+
+    injector.bind(Service)
+    injector.bind(Handler)
+
+    factory = injector.get_factory(Handler, arguments=('payload', 'count'))
+
+    with pytest.raises(TypeError):
+        factory('a', 1, 2)
+
+
+def test_get_factory_argument_given_twice() -> None:
+    injector = Injector()
+
+    injector.bind(Service)
+    injector.bind(Handler)
+
+    factory = injector.get_factory(Handler, arguments=('payload', 'count'))
+
+    with pytest.raises(TypeError, match='multiple values for argument `payload`'):
+        factory('a', payload='b', count=1)
+
+
+def test_get_factory_dependency_cycle() -> None:
+    injector = Injector()
+
+    def provide_int(s: str) -> int:
+        return int(s)
+
+    def provide_str(i: int) -> str:
+        return str(i)
+
+    injector.bind(provide_int, singleton=False)
+    injector.bind(provide_str, singleton=False)
+
+    with pytest.raises(TypeError):
+        injector.get_factory(int)
+
+
+def test_get_factory_caller_arguments_take_precedence() -> None:
+    injector = Injector()
+
+    class Session:
+        pass
+
+    def provide_handler(service: Service, session: Session, payload: str) -> Handler:
+        handler = Handler(service, payload, 0)
+        setattr(handler, 'session', session)
+        return handler
+
+    injector.bind(Service)
+    injector.bind(Session, singleton=False)
+    injector.bind(provide_handler, singleton=False)
+
+    factory = injector.get_factory(Handler, arguments=('payload',))
+    service = Service()
+    session = Session()
+
+    a = factory('a', service=service)
+    b = factory('b', session=session)
+    c = factory(payload='c', service=service, session=session)
+
+    assert a.service is service
+    assert b.service is injector.get(Service)
+    assert getattr(b, 'session') is session
+    assert (c.payload, c.service, getattr(c, 'session')) == ('c', service, session)
+
+
+def test_get_factory_arguments_before_dependencies() -> None:
+    injector = Injector()
+
+    class Reversed:
+
+        def __init__(self, payload: str, count: int, service: Service) -> None:
+            self.payload = payload
+            self.count = count
+            self.service = service
+
+    injector.bind(Service)
+    injector.bind(Reversed, singleton=False)
+
+    factory = injector.get_factory(Reversed, arguments=('payload', 'count'))
+    a = factory('a', 1)
+    b = factory('b', count=2)
+
+    assert (a.payload, a.count, a.service) == ('a', 1, injector.get(Service))
+    assert (b.payload, b.count, b.service) == ('b', 2, injector.get(Service))
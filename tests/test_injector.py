@@ -4,6 +4,8 @@ from typing import (
     Optional,
 )
 
+import pytest
+
 from applipy_inject import Injector, name
 
 from .common import Sub, Super
@@ -295,3 +297,47 @@ def test_bind_annotated() -> None:
     injector.bind(int, 4, name='denom')
 
     assert injector.get(float) == 3/4
+
+
+def test_get_many() -> None:
+    injector = Injector()
+
+    injector.bind(int, 1)
+    injector.bind(str, 'a')
+    injector.bind(str, 'b', name='k')
+
+    assert injector.get_many([(int, None), (str, None), (str, 'k')]) == [1, 'a', 'b']
+
+
+def test_get_many_shares_transient_dependencies() -> None:
+    injector = Injector()
+
+    class Session:
+        pass
+
+    class A:
+        def __init__(self, session: Session) -> None:
+            self.session = session
+
+    class B:
+        def __init__(self, session: Session, sessions: List[Session]) -> None:
+            self.session = session
+            self.sessions = sessions
+
+    injector.bind(Session, singleton=False)
+    injector.bind(A, singleton=False)
+    injector.bind(B, singleton=False)
+
+    a, b, session = injector.get_many([(A, None), (B, None), (Session, None)])
+
+    assert a.session is b.session
+    assert b.sessions == [b.session]
+    assert session is a.session
+    assert injector.get(A).session is not a.session
+
+
+def test_get_many_missing() -> None:
+    injector = Injector()
+
+    with pytest.raises(ValueError):
+        injector.get_many([(int, None)])
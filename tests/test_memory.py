@@ -0,0 +1,245 @@
+import asyncio
+import time
+import tracemalloc
+from threading import Barrier, BrokenBarrierError, Event, Thread
+from typing import Callable, List
+
+import pytest
+
+from applipy_inject import Injector
+
+
+class Table:
+
+    def __init__(self) -> None:
+        self.data = bytearray(1_000_000)
+
+
+class Service:
+
+    def __init__(self, table: Table) -> None:
+        self.table = table
+        self.cache = bytearray(100_000)
+
+
+class Request:
+
+    def __init__(self) -> None:
+        self.buffer = bytearray(10_000)
+
+
+def test_memory_report() -> None:
+    injector = Injector()
+    injector.bind(Table)
+    injector.bind(Service)
+    injector.bind(Request, singleton=False)
+
+    injector.start_memory_tracking()
+    try:
+        injector.get(Service)
+        injector.get(Request)
+        injector.get(Request)
+        report = injector.memory_report()
+    finally:
+        injector.stop_memory_tracking()
+
+    usages = {usage.key: usage for usage in report}
+
+    assert [usage.key for usage in report] == [(None, Table), (None, Service), (None, Request)]
+    assert 1_000_000 <= usages[None, Table].allocated < 1_050_000
+    assert 100_000 <= usages[None, Service].allocated < 150_000
+    assert 1_000_000 <= (usages[None, Table].retained or 0) < 1_050_000
+    assert 100_000 <= (usages[None, Service].retained or 0) < 150_000
+    assert usages[None, Request].instantiations == 2
+    assert usages[None, Request].retained is None
+
+
+def test_memory_report_excludes_nested_gets() -> None:
+    injector = Injector()
+    injector.bind(Table)
+
+    def provide_service() -> Service:
+        return Service(injector.get(Table))
+
+    injector.bind(provide_service)
+
+    injector.start_memory_tracking()
+    try:
+        injector.get(Service)
+        usages = {usage.key: usage for usage in injector.memory_report()}
+    finally:
+        injector.stop_memory_tracking()
+
+    assert usages[None, Service].allocated < 150_000
+    assert usages[None, Table].allocated >= 1_000_000
+
+
+def test_memory_tracking_not_enabled() -> None:
+    injector = Injector()
+
+    with pytest.raises(RuntimeError):
+        injector.memory_report()
+
+
+def test_stop_memory_tracking_keeps_external_tracemalloc() -> None:
+    injector = Injector()
+
+    tracemalloc.start()
+    try:
+        injector.start_memory_tracking()
+        injector.stop_memory_tracking()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_report_interleaved_async_providers() -> None:
+    injector = Injector()
+
+    class Large:
+        pass
+
+    class Small:
+        pass
+
+    async def provide_large() -> Large:
+        large = Large()
+        await asyncio.sleep(0.01)
+        setattr(large, 'data', bytearray(800_000))
+        await asyncio.sleep(0.01)
+        return large
+
+    async def provide_small() -> Small:
+        await asyncio.sleep(0.005)
+        small = Small()
+        await asyncio.sleep(0.02)
+        return small
+
+    injector.bind(provide_large)
+    injector.bind(provide_small)
+
+    async def run() -> None:
+        await asyncio.gather(injector.aget(Large), injector.aget(Small))
+
+    injector.start_memory_tracking()
+    try:
+        asyncio.run(run())
+        usages = {usage.key: usage for usage in injector.memory_report()}
+    finally:
+        injector.stop_memory_tracking()
+
+    assert usages[None, Large].allocated >= 800_000
+    assert usages[None, Small].allocated < 100_000
+
+
+def test_memory_report_concurrent_threads() -> None:
+    injector = Injector()
+    barrier = Barrier(2, timeout=0.2)
+
+    def wait() -> None:
+        try:
+            barrier.wait()
+        except BrokenBarrierError:
+            pass
+
+    def provide(size: int) -> Callable[[], bytearray]:
+        # If both providers ran at the same time, both would allocate while
+        # the other one is being measured.
+        def provide_bytearray() -> bytearray:
+            wait()
+            data = bytearray(size)
+            wait()
+            return data
+        return provide_bytearray
+
+    injector.bind(bytearray, provide(500_000), name='large')
+    injector.bind(bytearray, provide(10_000), name='small')
+
+    injector.start_memory_tracking()
+    try:
+        threads = [Thread(target=injector.get, args=(bytearray, name)) for name in ('large', 'small')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        usages = {usage.key: usage for usage in injector.memory_report()}
+    finally:
+        injector.stop_memory_tracking()
+
+    assert 500_000 <= usages['large', bytearray].allocated < 550_000
+    assert 10_000 <= usages['small', bytearray].allocated < 60_000
+
+
+def test_memory_tracking_refuses_sync_get_while_async_provider_is_tracked() -> None:
+    injector = Injector()
+    building = asyncio.Event()
+
+    async def provide_int() -> int:
+        building.set()
+        await asyncio.sleep(0.01)
+        return 1
+
+    injector.bind(provide_int)
+    injector.bind(Request, singleton=False)
+
+    async def run() -> None:
+        task = asyncio.create_task(injector.aget(int))
+        await building.wait()
+        with pytest.raises(RuntimeError, match='aget'):
+            injector.get(Request)
+        await task
+        assert isinstance(injector.get(Request), Request)
+
+    injector.start_memory_tracking()
+    try:
+        asyncio.run(run())
+    finally:
+        injector.stop_memory_tracking()
+
+
+def test_memory_tracking_waiting_for_a_singleton_built_by_another_thread() -> None:
+    injector = Injector()
+    started = Event()
+
+    class Shared:
+
+        def __init__(self, ints: List[int]) -> None:
+            self.data = bytearray(500_000)
+
+    class Parent:
+
+        def __init__(self, shared: Shared) -> None:
+            self.shared = shared
+
+    def provide_parent() -> Parent:
+        started.set()
+        # Wait for the other thread to claim the shared singleton, so this
+        # provider waits for it while it holds the memory tracking lock.
+        deadline = time.monotonic() + 5
+        while injector.providers[None, Shared][0].pending is None and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return Parent(injector.get(Shared))
+
+    injector.bind(int, 1)
+    injector.bind(Shared)
+    injector.bind(Parent, provide_parent)
+
+    def get_shared() -> None:
+        started.wait(5)
+        injector.get(Shared)
+
+    injector.start_memory_tracking()
+    try:
+        threads = [Thread(target=target, daemon=True) for target in (lambda: injector.get(Parent), get_shared)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        assert not any(thread.is_alive() for thread in threads)
+        usages = {usage.key: usage for usage in injector.memory_report()}
+    finally:
+        injector.stop_memory_tracking()
+
+    assert injector.get(Parent).shared is injector.get(Shared)
+    assert usages[None, Shared].allocated >= 500_000
+    assert usages[None, Parent].allocated < 100_000
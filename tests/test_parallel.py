@@ -0,0 +1,192 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from threading import Barrier, Thread
+from time import sleep
+from typing import Any, Callable, Iterator, List
+
+from applipy_inject import Injector
+
+
+class HealthCheck:
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+
+
+def make_check(index: int, delay: float = 0.1) -> Callable[[], HealthCheck]:
+    def provide() -> HealthCheck:
+        sleep(delay)
+        return HealthCheck(index)
+
+    return provide
+
+
+def make_concurrent_check(index: int, barrier: Barrier) -> Callable[[], HealthCheck]:
+    # Only returns if all the checks sharing the barrier run at the same time
+    def provide() -> HealthCheck:
+        barrier.wait()
+        return HealthCheck(index)
+
+    return provide
+
+
+def test_parallel_collection() -> None:
+    injector = Injector(parallel_collections=True)
+    barrier = Barrier(5, timeout=5)
+    for i in range(5):
+        injector.bind(HealthCheck, make_concurrent_check(i, barrier))
+
+    class Service:
+        def __init__(self, checks: List[HealthCheck]) -> None:
+            self.checks = checks
+
+    injector.bind(Service)
+
+    service = injector.get(Service)
+
+    assert [c.index for c in service.checks] == [0, 1, 2, 3, 4]
+    assert injector.get_all(HealthCheck) == service.checks
+    injector.close()
+
+
+def test_parallel_collection_with_transient_and_singleton() -> None:
+    injector = Injector(parallel_collections=True)
+    injector.bind(HealthCheck, make_check(0, 0), singleton=False)
+    injector.bind(HealthCheck, make_check(1, 0))
+
+    first = injector.get_all(HealthCheck)
+    second = injector.get_all(HealthCheck)
+
+    assert [c.index for c in first] == [0, 1]
+    assert first[0] is not second[0]
+    assert first[1] is second[1]
+
+
+def test_parallel_nested_collections_do_not_starve_executor() -> None:
+    injector = Injector(parallel_collections=True, executor=ThreadPoolExecutor(max_workers=1))
+
+    for i in range(3):
+        injector.bind(int, make_check(i, 0), singleton=False)
+
+    def provide_check(ints: List[int]) -> HealthCheck:
+        return HealthCheck(len(ints))
+
+    for _ in range(3):
+        injector.bind(provide_check, singleton=False)
+
+    assert [c.index for c in injector.get_all(HealthCheck)] == [3, 3, 3]
+
+
+def test_parallel_collection_disposals() -> None:
+    injector = Injector(parallel_collections=True)
+    events: List[str] = []
+    barrier = Barrier(2, timeout=5)
+
+    def make_resource(index: int) -> Callable[[], Iterator[HealthCheck]]:
+        def provide() -> Iterator[HealthCheck]:
+            barrier.wait()
+            yield HealthCheck(index)
+            events.append(f'check {index}')
+
+        return provide
+
+    injector.bind(HealthCheck, make_resource(0))
+    injector.bind(HealthCheck, make_resource(1))
+
+    def provide_str(checks: List[HealthCheck]) -> Iterator[str]:
+        yield 'service'
+        events.append('service')
+
+    injector.bind(provide_str)
+
+    injector.get(str)
+    injector.close()
+
+    assert events[0] == 'service'
+    assert sorted(events[1:]) == ['check 0', 'check 1']
+
+
+def test_parallel_collection_async() -> None:
+    injector = Injector(parallel_collections=True)
+    arrived: List[int] = []
+    everyone = asyncio.Event()
+
+    def make_async_check(index: int) -> Callable[[], Any]:
+        async def provide() -> HealthCheck:
+            arrived.append(index)
+            if len(arrived) == 5:
+                everyone.set()
+            await asyncio.wait_for(everyone.wait(), 5)
+            return HealthCheck(index)
+
+        return provide
+
+    for i in range(5):
+        injector.bind(HealthCheck, make_async_check(i))
+
+    checks = asyncio.run(injector.aget_all(HealthCheck))
+
+    assert [c.index for c in checks] == [0, 1, 2, 3, 4]
+
+
+def test_parallel_collection_async_with_sync_providers() -> None:
+    injector = Injector(parallel_collections=True)
+    barrier = Barrier(5, timeout=5)
+    for i in range(5):
+        injector.bind(HealthCheck, make_concurrent_check(i, barrier))
+
+    checks = asyncio.run(injector.aget_all(HealthCheck))
+
+    assert [c.index for c in checks] == [0, 1, 2, 3, 4]
+    injector.close()
+
+
+def test_parallel_collection_keeps_context() -> None:
+    injector = Injector(parallel_collections=True)
+    request_id: ContextVar[str] = ContextVar('request_id', default='')
+    barrier = Barrier(3, timeout=5)
+
+    def make_request_check(index: int) -> Callable[[], HealthCheck]:
+        def provide() -> HealthCheck:
+            barrier.wait()
+            return HealthCheck(index) if request_id.get() == 'request' else HealthCheck(-1)
+        return provide
+
+    for i in range(3):
+        injector.bind(HealthCheck, make_request_check(i), singleton=False)
+
+    request_id.set('request')
+
+    assert [c.index for c in injector.get_all(HealthCheck)] == [0, 1, 2]
+    injector.close()
+
+
+def test_parallel_collection_with_memory_tracking() -> None:
+    injector = Injector(parallel_collections=True)
+
+    class Service:
+        def __init__(self, checks: List[HealthCheck]) -> None:
+            self.checks = checks
+
+    def provide_service() -> Service:
+        return Service(injector.get_all(HealthCheck))
+
+    for i in range(3):
+        injector.bind(HealthCheck, make_check(i, 0), singleton=False)
+    injector.bind(Service, provide_service)
+
+    services: List[Service] = []
+    injector.start_memory_tracking()
+    try:
+        getter = Thread(target=lambda: services.append(injector.get(Service)), daemon=True)
+        getter.start()
+        getter.join(5)
+        assert not getter.is_alive()
+        usages = {usage.key: usage for usage in injector.memory_report()}
+    finally:
+        injector.stop_memory_tracking()
+
+    assert [c.index for c in services[0].checks] == [0, 1, 2]
+    assert usages[None, HealthCheck].instantiations == 3
+    injector.close()
@@ -0,0 +1,120 @@
+from concurrent.futures import Future
+from threading import Event, Thread
+from typing import AsyncIterator, Callable, List
+
+import pytest
+
+from applipy_inject import Injector
+
+
+class A:
+    pass
+
+
+class B:
+
+    def __init__(self, a: A) -> None:
+        self.a = a
+
+
+class C:
+    pass
+
+
+def test_prewarm_builds_singletons() -> None:
+    injector = Injector()
+    injector.bind(A)
+    injector.bind(B)
+    injector.bind(C, singleton=False)
+
+    ready = injector.prewarm_in_background()
+
+    assert ready.result(timeout=5) is None
+    assert injector.providers[None, A][0].instance is not None
+    assert injector.providers[None, B][0].instance is not None
+    assert injector.providers[None, C][0].instance is None
+    assert injector.get(B).a is injector.get(A)
+
+
+def test_prewarm_priority_is_built_first() -> None:
+    injector = Injector()
+    built: List[str] = []
+
+    def provide(value: str) -> Callable[[], str]:
+        def provide_str() -> str:
+            built.append(value)
+            return value
+        return provide_str
+
+    injector.bind(str, provide('first'), name='first')
+    injector.bind(str, provide('second'), name='second')
+
+    injector.prewarm_in_background(priority=[(str, 'second')]).result(timeout=5)
+
+    assert built == ['second', 'first']
+
+
+def test_get_waits_for_the_build_in_progress() -> None:
+    injector = Injector()
+    started = Event()
+    release = Event()
+    built: List[A] = []
+
+    def provide() -> A:
+        started.set()
+        release.wait(5)
+        built.append(A())
+        return built[-1]
+
+    injector.bind(provide)
+
+    ready = injector.prewarm_in_background()
+    assert started.wait(5)
+    assert not ready.done()
+
+    results: List[A] = []
+    getter = Thread(target=lambda: results.append(injector.get(A)))
+    getter.start()
+    getter.join(0.05)
+    assert getter.is_alive()
+
+    release.set()
+    getter.join(5)
+    ready.result(timeout=5)
+
+    assert built == results
+
+
+def test_prewarm_skips_async_providers() -> None:
+    injector = Injector()
+
+    async def provide_a() -> AsyncIterator[A]:
+        yield A()
+
+    injector.bind(provide_a)
+    injector.bind(B)
+    injector.bind(C)
+
+    injector.prewarm_in_background().result(timeout=5)
+
+    assert injector.providers[None, A][0].instance is None
+    assert injector.providers[None, B][0].instance is None
+    assert injector.providers[None, C][0].instance is not None
+
+
+def test_prewarm_reports_first_error_and_callback() -> None:
+    injector = Injector()
+    done: List[Future[None]] = []
+
+    def fail() -> A:
+        raise RuntimeError('failed')
+
+    injector.bind(fail)
+    injector.bind(C)
+
+    ready = injector.prewarm_in_background(callback=done.append)
+
+    with pytest.raises(RuntimeError, match='failed'):
+        ready.result(timeout=5)
+    assert done == [ready]
+    assert injector.providers[None, C][0].instance is not None
@@ -0,0 +1,214 @@
+import multiprocessing
+import os
+import struct
+import time
+from multiprocessing.queues import Queue
+from multiprocessing.synchronize import Barrier
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from applipy_inject import Injector
+from applipy_inject.shared import shared_directory
+
+
+class Config:
+    pass
+
+
+class Table:
+
+    def __init__(self, data: memoryview) -> None:
+        self.data = data
+
+
+def build_table(size: int) -> bytes:
+    return bytes(i % 251 for i in range(size))
+
+
+def segment_key(test: str) -> str:
+    return f'applipy_test_{os.getpid()}_{test}'
+
+
+def test_bind_shared_attaches_to_existing_payload() -> None:
+    calls: List[int] = []
+    key = segment_key('attach')
+
+    def provide(size: int) -> bytes:
+        calls.append(size)
+        return build_table(size)
+
+    first = Injector()
+    first.bind(int, 1000)
+    first.bind_shared(bytes, provide, key=key)
+
+    second = Injector()
+    second.bind(int, 1000)
+    second.bind_shared(bytes, provide, key=key)
+
+    a = first.get(bytes)
+    b = second.get(bytes)
+
+    assert calls == [1000]
+    assert isinstance(a, memoryview) and isinstance(b, memoryview)
+    assert a.readonly
+    assert a == b == build_table(1000)
+
+    second.close()
+    first.close()
+
+    assert not os.path.exists(os.path.join(shared_directory(), key))
+
+
+def test_bind_shared_loads() -> None:
+    injector = Injector()
+    injector.bind_shared(Table, lambda: build_table(10), key=segment_key('loads'), loads=Table)
+
+    table = injector.get(Table)
+
+    assert isinstance(table, Table)
+    assert table.data == build_table(10)
+    assert injector.get(Table) is table
+
+    injector.close()
+
+
+def test_bind_shared_empty_payload() -> None:
+    injector = Injector()
+    injector.bind_shared(bytes, lambda: b'', key=segment_key('empty'))
+
+    assert injector.get(bytes) == b''
+
+    injector.close()
+
+
+def resolve_in_worker(key: str) -> Tuple[int, bytes]:
+    calls: List[int] = []
+
+    def provide() -> bytes:
+        calls.append(1)
+        return build_table(100_000)
+
+    injector = Injector()
+    injector.bind_shared(bytes, provide, key=key)
+    payload = injector.get(bytes)
+    digest = bytes(payload[:16])
+    injector.close()
+    return len(calls), digest
+
+
+def test_bind_shared_across_processes() -> None:
+    key = segment_key('processes')
+    injector = Injector()
+    injector.bind_shared(bytes, lambda: build_table(100_000), key=key)
+    payload = injector.get(bytes)
+
+    with multiprocessing.get_context('spawn').Pool(2) as pool:
+        results = pool.map(resolve_in_worker, [key] * 4)
+
+    assert results == [(0, bytes(payload[:16]))] * 4
+
+    injector.close()
+
+
+def resolve_at_the_same_time(key: str, barrier: Barrier, results: 'Queue[Tuple[int, bytes]]') -> None:
+    calls: List[int] = []
+
+    def provide() -> bytes:
+        calls.append(1)
+        time.sleep(0.1)
+        return build_table(100_000)
+
+    injector = Injector()
+    injector.bind_shared(bytes, provide, key=key)
+    barrier.wait()
+    payload = injector.get(bytes)
+    results.put((len(calls), bytes(payload[:16])))
+    # The payload is removed when the process that built it closes, so every
+    # worker resolves it before any of them closes.
+    barrier.wait()
+    injector.close()
+
+
+def test_bind_shared_workers_starting_at_the_same_time() -> None:
+    key = segment_key('same_time')
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(4)
+    results: 'Queue[Tuple[int, bytes]]' = context.Queue()
+    workers = [context.Process(target=resolve_at_the_same_time, args=(key, barrier, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(30)
+
+    assert sum(calls for calls, _ in outcomes) == 1
+    assert {digest for _, digest in outcomes} == {build_table(16)}
+    assert not os.path.exists(os.path.join(shared_directory(), key))
+
+
+def exit_immediately() -> None:
+    pass
+
+
+def test_bind_shared_rebuilds_stale_payloads() -> None:
+    process = multiprocessing.get_context('spawn').Process(target=exit_immediately)
+    process.start()
+    process.join()
+    assert process.pid is not None
+    header = struct.pack('!8sQ', b'applipy\x01', process.pid)
+
+    key = segment_key('stale')
+    other = os.path.join(shared_directory(), segment_key('stale_other'))
+    for path in (os.path.join(shared_directory(), key), other):
+        with open(path, 'wb') as f:
+            f.write(header + b'stale')
+
+    injector = Injector()
+    injector.bind_shared(bytes, lambda: b'fresh', key=key)
+
+    assert injector.get(bytes) == b'fresh'
+    assert not os.path.exists(other)
+
+    injector.close()
+
+
+def test_bind_shared_resolves_in_the_injector_getting_it() -> None:
+    key = segment_key('clone')
+    published: List[bool] = []
+
+    def provide_config() -> Iterator[Config]:
+        yield Config()
+        published.append(os.path.exists(os.path.join(shared_directory(), key)))
+
+    def provide(config: Config) -> bytes:
+        return build_table(10)
+
+    injector = Injector()
+    injector.bind(provide_config)
+    injector.bind_shared(bytes, provide, key=key)
+
+    clone = injector.clone()
+    assert clone.get(bytes) == build_table(10)
+    assert clone.providers[None, Config][0].instance is not None
+    assert injector.providers[None, Config][0].instance is None
+
+    # The payload depends on the config, so it is removed before the config
+    # is closed.
+    clone.close()
+    assert published == [False]
+
+
+def test_bind_shared_dependency_cycle() -> None:
+    injector = Injector()
+
+    def provide(payload: bytes) -> bytes:
+        return payload
+
+    injector.bind_shared(bytes, provide, key=segment_key('cycle'))
+
+    with pytest.raises(TypeError) as error:
+        injector.get(bytes)
+
+    assert 'dependency cycle' in str(error.value.__cause__)
+    assert not os.path.exists(os.path.join(shared_directory(), segment_key('cycle')))